@@ -689,7 +689,8 @@ def full_os_environ_for_shell(env=None):
 #-------------------------------------------------------------------------------
 
 def run_command(args, pkg = None, echo = False,
-                stdout = sys.stdout, stderr = sys.stderr, env = None):
+                stdout = sys.stdout, stderr = sys.stderr, env = None,
+                cwd = None):
     """
     Run a command.
     """
@@ -734,6 +735,7 @@ def run_command(args, pkg = None, echo = False,
                                  executable=get_shell_type(),
                                  universal_newlines=True,
                                  env=full_os_environ_for_shell(env),
+                                 cwd=cwd,
                                  **kwargs)
         else:
             if env is None:
@@ -741,6 +743,7 @@ def run_command(args, pkg = None, echo = False,
             p = subprocess.Popen(args,
                                  universal_newlines=True,
                                  env=env,
+                                 cwd=cwd,
                                  **kwargs)
         p.communicate()
         returncode = p.returncode
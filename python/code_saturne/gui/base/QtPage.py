@@ -403,6 +403,16 @@ class ComboModel:
         self.combo.setItemDelegate(GroupDelegate(self.combo))
 
 
+    def setCombo(self, combo):
+        """
+        Attach the model to another QComboBox, so that its items
+        can be reused (for example by successive delegate editors).
+        """
+        self.combo = combo
+        self.combo.setModel(self.model)
+        self.combo.setItemDelegate(GroupDelegate(self.combo))
+
+
     def addItemGroup(self, group_name):
 
         if group_name in self.item_groups.keys():
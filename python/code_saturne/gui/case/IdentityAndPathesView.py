@@ -35,6 +35,7 @@ This module contains the following classes:
 #-------------------------------------------------------------------------------
 
 import os
+import stat
 import logging
 
 from code_saturne.gui.base.QtCore    import *
@@ -90,6 +91,15 @@ class IdentityAndPathesView(QWidget, Ui_IdentityAndPathesForm):
 
         self.case.undoStopGlobal()
 
+        self._path_line_edits = (self.lineEditData,
+                                 self.lineEditResults,
+                                 self.lineEditUserSrc)
+
+        self._subdir_msgs = (self.tr("Warning: the DATA sub-directory DATA is required."),
+                             self.tr("Warning: the RESU sub-directory RESU is required."),
+                             self.tr("Warning: the SRC sub-directory SRC is required."))
+        self._msg_error = self.tr("Associated sub-directory not found")
+
         self.path = ['data_path',
                      'resu_path',
                      'user_src_path',
@@ -175,62 +185,68 @@ class IdentityAndPathesView(QWidget, Ui_IdentityAndPathesForm):
             self.__updateId(dir_name)
 
 
-    def __getAbsolutePath(self):
+    def __scanDir(self, dir_path):
         """
-        Get absolute path for the case sub-directories and the meshes.
+        Return the names of sub-directories of a given directory.
         """
-        self.case_path = self.mdl.getCasePath()
-        self.lineEditCasePath.setText(self.case_path)
-        case_dir = os.path.abspath(self.case_path)
-        self.case_path = case_dir
-
-        line_name = ['Data', 'Results', 'UserSrc', 'Scripts']
-
-        if os.path.isdir(case_dir) :
-            self.mdl.setCasePath(case_dir)
-            self.__updateId(case_dir)
-
-            msg = [self.tr("Warning: the DATA sub-directory DATA is required."),
-                   self.tr("Warning: the RESU sub-directory RESU is required."),
-                   self.tr("Warning: the SRC sub-directory SRC is required.")]
+        with os.scandir(dir_path) as it:
+            return frozenset(e.name for e in it if e.is_dir())
 
-            msgError = self.tr("Associated sub-directory not found")
 
-            for i in range(0, 3):
-                if sub_dir[i] in os.listdir(case_dir):
-                    self.mdl.setPath(self.path[i], os.path.abspath(case_dir + '/' + sub_dir[i]))
-                    line = getattr(self, "lineEdit"+line_name[i])  # line is self.lineEditXXX
-                    line.setText(str(sub_dir[i]))
-
-                    line.setStatusTip("")
-                    self.mdl.setRelevantSubdir("yes", sub_dir[i])
+    def __getAbsolutePath(self):
+        """
+        Get absolute path for the case sub-directories and the meshes.
+        """
+        # Coalesce widget repaints into a single update
+        self.setUpdatesEnabled(False)
+        try:
+            self.case_path = self.mdl.getCasePath()
+            self.lineEditCasePath.setText(self.case_path)
+            case_dir = os.path.abspath(self.case_path)
+            self.case_path = case_dir
+
+            if os.path.isdir(case_dir) :
+                self.mdl.setCasePath(case_dir)
+                self.__updateId(case_dir)
+
+                entries = self.__scanDir(case_dir)
+
+                for i in range(0, 3):
+                    if sub_dir[i] in entries:
+                        self.mdl.setPath(self.path[i], os.path.join(case_dir, sub_dir[i]))
+                        line = self._path_line_edits[i]
+                        line.setText(str(sub_dir[i]))
+
+                        line.setStatusTip("")
+                        self.mdl.setRelevantSubdir("yes", sub_dir[i])
+                    else:
+                        self.mdl.setPath(self.path[i], "")
+                        line = self._path_line_edits[i]
+                        line.setText(self._msg_error)
+                        line.setStatusTip(self._subdir_msgs[i])
+                        self.mdl.setRelevantSubdir("no", sub_dir[i])
+
+                mesh_path = os.path.join(self.spath, meshes_dir)
+                try:
+                    set_subdir = stat.S_ISDIR(os.stat(mesh_path).st_mode)
+                except OSError:
+                    set_subdir = False
+                if set_subdir:
+                    self.mdl.setPath(self.path[3], mesh_path)
+                    self.mdl.setRelevantSubdir("yes", self.path[3])
                 else:
-                    self.mdl.setPath(self.path[i], "")
-                    line = getattr(self, "lineEdit"+line_name[i])  # line is self.lineEditXXX
-                    line.setText(msgError)
-                    line.setStatusTip(msg[i])
-                    self.mdl.setRelevantSubdir("no", sub_dir[i])
-
-            set_subdir = False
-            try:
-                if os.path.isdir(self.spath) and meshes_dir in os.listdir(self.spath):
-                    set_subdr = True
-            except Exception:
-                pass
-            if set_subdir:
-                self.mdl.setPath(self.path[3], os.path.abspath(self.spath + '/' + meshes_dir))
-                self.mdl.setRelevantSubdir("yes", self.path[3])
-            else:
-                self.mdl.setPath(self.path[3], "")
-                self.mdl.setRelevantSubdir("no", self.path[3])
+                    self.mdl.setPath(self.path[3], "")
+                    self.mdl.setRelevantSubdir("no", self.path[3])
 
-        else:
-            for i in range(0, 3):
-                line = getattr(self, "lineEdit"+line_name[i])  # line is self.lineEditXXX
-                line.setText(unknown_dir)
-
-            msg = self.tr("Warning: the given directory does not exist.")
-            self.mdl.setRelevantSubdir("no", '')
+            else:
+                for i in range(0, 3):
+                    line = self._path_line_edits[i]
+                    line.setText(unknown_dir)
+
+                msg = self.tr("Warning: the given directory does not exist.")
+                self.mdl.setRelevantSubdir("no", '')
+        finally:
+            self.setUpdatesEnabled(True)
 
 
 #-------------------------------------------------------------------------------
@@ -59,6 +59,7 @@ from code_saturne.gui.base.QtPage import from_qvariant, to_text_string
 from code_saturne.model.Common import LABEL_LENGTH_MAX, GuiParam
 
 from code_saturne.gui.case.MainFields import Ui_MainFields
+from code_saturne.gui.case.VerifyExistenceLabelDialogView import VerifyExistenceLabelDialogView
 from code_saturne.model.MainFieldsModel import MainFieldsModel
 
 from code_saturne.model.LagrangianModel import LagrangianModel
@@ -71,6 +72,24 @@ logging.basicConfig()
 log = logging.getLogger("MainFieldsView")
 log.setLevel(GuiParam.DEBUG)
 
+# Table columns displayed as text (column 4 is a check box)
+_TEXT_COLS = frozenset((0, 1, 2, 3, 5))
+
+# Regular expression for valid field labels
+_LABEL_RX = "[_a-zA-Z][_A-Za-z0-9]{1," + str(LABEL_LENGTH_MAX-1) + "}"
+
+#-------------------------------------------------------------------------------
+# Field id to label mapping
+#-------------------------------------------------------------------------------
+
+def _fieldLabelsById(mdl):
+    """
+    Return a dictionary of field labels indexed by field id.
+    Special carrier ids ("none", "off", "all") are their own label
+    and are not included.
+    """
+    return {field.f_id: field.label for field in mdl.list_of_fields}
+
 #-------------------------------------------------------------------------------
 # Line edit delegate for the label
 #-------------------------------------------------------------------------------
@@ -83,13 +102,12 @@ class LabelDelegate(QItemDelegate):
         QItemDelegate.__init__(self, parent)
         self.parent = parent
         self.old_plabel = ""
+        self.regExp = QRegExp(_LABEL_RX)
 
 
     def createEditor(self, parent, option, index):
         editor = QLineEdit(parent)
         self.old_label = ""
-        rx = "[_a-zA-Z][_A-Za-z0-9]{1," + str(LABEL_LENGTH_MAX-1) + "}"
-        self.regExp = QRegExp(rx)
         v = RegExpValidator(editor, self.regExp)
         editor.setValidator(v)
         return editor
@@ -109,19 +127,18 @@ class LabelDelegate(QItemDelegate):
         if editor.validator().state == QValidator.Acceptable:
             new_plabel = str(editor.text())
 
-            if new_plabel in model.mdl.getFieldLabelsList():
+            if new_plabel in model.label_set:
                 default = {}
                 default['label']  = self.old_plabel
-                default['list']   = model.mdl.getFieldLabelsList()
+                default['list']   = set(model.label_set)
                 default['regexp'] = self.regExp
-                log.debug("setModelData -> default = %s" % default)
+                log.debug("setModelData -> default = %s", default)
 
-                from code_saturne.gui.case.VerifyExistenceLabelDialogView import VerifyExistenceLabelDialogView
                 dialog = VerifyExistenceLabelDialogView(self.parent, default)
                 if dialog.exec_():
                     result = dialog.get_result()
                     new_plabel = result['label']
-                    log.debug("setModelData -> result = %s" % result)
+                    log.debug("setModelData -> result = %s", result)
                 else:
                     new_plabel = self.old_plabel
 
@@ -138,14 +155,19 @@ class NatureDelegate(QItemDelegate):
     def __init__(self, parent):
         super(NatureDelegate, self).__init__(parent)
         self.parent   = parent
+        self._items = [[self.tr("liquid"), 'liquid'],
+                       [self.tr("gas"), 'gas'],
+                       [self.tr("solid"), 'solid']]
+        self.modelCombo = None
 
 
     def createEditor(self, parent, option, index):
         editor = QComboBox(parent)
-        self.modelCombo = ComboModel(editor, 3, 1)
-        self.modelCombo.addItem(self.tr("liquid"), 'liquid')
-        self.modelCombo.addItem(self.tr("gas"), 'gas')
-        self.modelCombo.addItem(self.tr("solid"), 'solid')
+        if self.modelCombo is None:
+            self.modelCombo = ComboModel(editor, 3, 1)
+            self.modelCombo.addItemList(self._items)
+        else:
+            self.modelCombo.setCombo(editor)
 
         row = index.row()
         if (row == 0) :
@@ -166,12 +188,12 @@ class NatureDelegate(QItemDelegate):
     def setModelData(self, comboBox, model, index):
         txt = str(comboBox.currentText())
         value = self.modelCombo.dicoV2M[txt]
-        log.debug("NatureDelegate value = %s"%value)
+        log.debug("NatureDelegate value = %s", value)
 
         selectionModel = self.parent.selectionModel()
-        for idx in selectionModel.selectedIndexes():
-            if idx.column() == index.column():
-                model.setData(idx, value, Qt.DisplayRole)
+        rows = [idx.row() for idx in selectionModel.selectedIndexes()
+                if idx.column() == index.column()]
+        model.setBulkData(rows, index.column(), value)
 
 
 #-------------------------------------------------------------------------------
@@ -186,20 +208,30 @@ class EnthalpyDelegate(QItemDelegate):
         super(EnthalpyDelegate, self).__init__(parent)
         self.parent   = parent
         self.mdl      = mdl
+        # Specific enthalpy is not available for some predefined flows
+        self._items = [[self.tr("off"), 'off'],
+                       [self.tr("total enthalpy"), 'total_enthalpy'],
+                       [self.tr("specific enthalpy"), 'specific_enthalpy']]
+        self._items_predefined = self._items[:2]
+        self._combo_models = {}
+        self.modelCombo = None
 
 
     def createEditor(self, parent, option, index):
         editor = QComboBox(parent)
         predefined_flow = self.mdl.getPredefinedFlow()
-        if predefined_flow in ["free_surface", "boiling_flow", "droplet_flow", "multiregime"]:
-            self.modelCombo = ComboModel(editor, 2, 1)
-            self.modelCombo.addItem(self.tr("off"), 'off')
-            self.modelCombo.addItem(self.tr("total enthalpy"), 'total_enthalpy')
+        predefined = predefined_flow in ["free_surface", "boiling_flow", "droplet_flow", "multiregime"]
+        self.modelCombo = self._combo_models.get(predefined)
+        if self.modelCombo is None:
+            if predefined:
+                items = self._items_predefined
+            else:
+                items = self._items
+            self.modelCombo = ComboModel(editor, len(items), 1)
+            self.modelCombo.addItemList(items)
+            self._combo_models[predefined] = self.modelCombo
         else:
-            self.modelCombo = ComboModel(editor, 3, 1)
-            self.modelCombo.addItem(self.tr("off"), 'off')
-            self.modelCombo.addItem(self.tr("total enthalpy"), 'total_enthalpy')
-            self.modelCombo.addItem(self.tr("specific enthalpy"), 'specific_enthalpy')
+            self.modelCombo.setCombo(editor)
 
         editor.installEventFilter(self)
         return editor
@@ -214,12 +246,12 @@ class EnthalpyDelegate(QItemDelegate):
     def setModelData(self, comboBox, model, index):
         txt = str(comboBox.currentText())
         value = self.modelCombo.dicoV2M[txt]
-        log.debug("EnthalpyDelegate value = %s"%value)
+        log.debug("EnthalpyDelegate value = %s", value)
 
         selectionModel = self.parent.selectionModel()
-        for idx in selectionModel.selectedIndexes():
-            if idx.column() == index.column():
-                model.setData(idx, value, Qt.DisplayRole)
+        rows = [idx.row() for idx in selectionModel.selectedIndexes()
+                if idx.column() == index.column()]
+        model.setBulkData(rows, index.column(), value)
 
 
 #-------------------------------------------------------------------------------
@@ -233,16 +265,21 @@ class CriterionDelegate(QItemDelegate):
     def __init__(self, parent):
         super(CriterionDelegate, self).__init__(parent)
         self.parent   = parent
+        self._items = [[self.tr("continuous"), 'continuous'],
+                       [self.tr("dispersed"), 'dispersed'],
+                       [self.tr("auto"), 'auto']]
+        self.modelCombo = None
 
 
     def createEditor(self, parent, option, index):
         editor = QComboBox(parent)
-        self.modelCombo = ComboModel(editor, 3, 1)
-        self.modelCombo.addItem(self.tr("continuous"), 'continuous')
-        self.modelCombo.addItem(self.tr("dispersed"), 'dispersed')
-        self.modelCombo.addItem(self.tr("auto"), 'auto')
-        # TODO to delete if/when the auto option is implemented
-        self.modelCombo.disableItem(2)
+        if self.modelCombo is None:
+            self.modelCombo = ComboModel(editor, 3, 1)
+            self.modelCombo.addItemList(self._items)
+            # TODO to delete if/when the auto option is implemented
+            self.modelCombo.disableItem(2)
+        else:
+            self.modelCombo.setCombo(editor)
         # fixed to continuous for field 1
         if index.row() == 0 :
             editor.setEnabled(False)
@@ -261,12 +298,12 @@ class CriterionDelegate(QItemDelegate):
     def setModelData(self, comboBox, model, index):
         txt = str(comboBox.currentText())
         value = self.modelCombo.dicoV2M[txt]
-        log.debug("CriterionDelegate value = %s"%value)
+        log.debug("CriterionDelegate value = %s", value)
 
         selectionModel = self.parent.selectionModel()
-        for idx in selectionModel.selectedIndexes():
-            if idx.column() == index.column():
-                model.setData(idx, value, Qt.DisplayRole)
+        rows = [idx.row() for idx in selectionModel.selectedIndexes()
+                if idx.column() == index.column()]
+        model.setBulkData(rows, index.column(), value)
 
 
 #-------------------------------------------------------------------------------
@@ -282,19 +319,28 @@ class CarrierDelegate(QItemDelegate):
         super(CarrierDelegate, self).__init__(parent)
         self.parent   = parent
         self.mdl      = mdl
+        # Combo models, indexed by the set of choices they offer
+        self._combo_models = {}
 
 
     def createEditor(self, parent, option, index):
         editor = QComboBox(parent)
-        self.modelCombo = ComboModel(editor, 1, 1)
         field = self.mdl.list_of_fields[index.row()]
         if field.flow_type == "continuous" :
-            self.modelCombo.addItem(self.tr("off"), 'off')
+            key = ('off',)
         else :
-            for fld in self.mdl.getContinuousFieldList() :
-                self.modelCombo.addItem(self.tr(fld.label), fld.label)
+            key = tuple(fld.label for fld in self.mdl.getContinuousFieldList())
             if field.phase == "solid":
-                self.modelCombo.addItem(self.tr("all"), "all")
+                key += ('all',)
+
+        self.modelCombo = self._combo_models.get(key)
+        if self.modelCombo is None:
+            self.modelCombo = ComboModel(editor, 1, 1)
+            for label in key:
+                self.modelCombo.addItem(self.tr(label), label)
+            self._combo_models[key] = self.modelCombo
+        else:
+            self.modelCombo.setCombo(editor)
 
         editor.installEventFilter(self)
         return editor
@@ -310,24 +356,24 @@ class CarrierDelegate(QItemDelegate):
     def setModelData(self, comboBox, model, index):
         txt = str(comboBox.currentText())
         value = self.modelCombo.dicoV2M[txt]
-        log.debug("CarrierDelegate value = %s"%value)
+        log.debug("CarrierDelegate value = %s", value)
 
         selectionModel = self.parent.selectionModel()
-        for idx in selectionModel.selectedIndexes():
-            if idx.column() == index.column():
-                model.setData(idx, value, Qt.DisplayRole)
+        rows = [idx.row() for idx in selectionModel.selectedIndexes()
+                if idx.column() == index.column()]
+        model.setBulkData(rows, index.column(), value)
 
 
 #-------------------------------------------------------------------------------
 # StandardItemModelMainFields class
 #-------------------------------------------------------------------------------
 
-class StandardItemModelMainFields(QStandardItemModel):
+class StandardItemModelMainFields(QAbstractTableModel):
 
     def __init__(self, mdl):
         """
         """
-        QStandardItemModel.__init__(self)
+        QAbstractTableModel.__init__(self)
 
         self.headers = [ self.tr("Field\nlabel"),
                          self.tr("Phase of\nfield"),
@@ -336,33 +382,58 @@ class StandardItemModelMainFields(QStandardItemModel):
                          self.tr("Variable density"),
                          self.tr("Energy\nresolution")]
 
-        self.setColumnCount(len(self.headers))
-
         self.tooltip = []
 
         self._data = []
         self.mdl = mdl
 
+        # Cell update methods, by column
+        self._col_setters = (self.__setLabel,
+                             self.__setNature,
+                             self.__setCriterion,
+                             self.__setCarrier,
+                             self.__setCompressible,
+                             self.__setEnergy)
+
+        # Set of field labels, for quick checks on label edition
+        self.label_set = set(self.mdl.getFieldLabelsList())
+
+        # Formula nodes, which may reference field labels
+        self._formula_nodes = self.mdl.case.xmlGetNodeList('formula')
+
+        # Model settings used by flags(), which is called for each cell
+        self.__updateFlowSettings()
+
+
+    def __updateFlowSettings(self):
+        """
+        Cache the predefined flow and phase change transfer status.
+        """
+        self._predefined_flow = self.mdl.getPredefinedFlow()
+        self._phase_change = self.mdl.getPhaseChangeTransferStatus()
+
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._data)
+
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.headers)
+
 
     def data(self, index, role):
         if not index.isValid():
             return None
 
-        if role == Qt.ToolTipRole:
-            return None
-
-        elif role == Qt.DisplayRole:
-            data = self._data[index.row()][index.column()]
-            if index.column() in (0, 1, 2, 3, 5):
-                if data:
-                    return data
-                else:
-                    return None
+        if role == Qt.DisplayRole:
+            col = index.column()
+            if col in _TEXT_COLS:
+                return self._data[index.row()][col] or None
 
         elif role == Qt.CheckStateRole:
-            data = self._data[index.row()][index.column()]
-            if index.column() == 4:
-                if data == 'on':
+            col = index.column()
+            if col == 4:
+                if self._data[index.row()][col] == 'on':
                     return Qt.Checked
                 else:
                     return Qt.Unchecked
@@ -380,16 +451,16 @@ class StandardItemModelMainFields(QStandardItemModel):
         if index.column() == 4:
             return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
         elif index.column() == 5:
-            if self.mdl.getPredefinedFlow() != "None" \
-                    and self.mdl.getPredefinedFlow() != "particles_flow" \
-                    and self.mdl.getPhaseChangeTransferStatus() == "on":
+            if self._predefined_flow != "None" \
+                    and self._predefined_flow != "particles_flow" \
+                    and self._phase_change == "on":
                 return Qt.ItemIsSelectable
             else:
                 return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
         elif index.column() == 1 or index.column() == 2:
 
             field = self.mdl.list_of_fields[index.row()]
-            if self.mdl.getPredefinedFlow() != "None" and (index.row()==0 or index.row()==1):
+            if self._predefined_flow != "None" and (index.row()==0 or index.row()==1):
                 return Qt.ItemIsEnabled | Qt.ItemIsSelectable
             elif field.phase == "solid" and index.column() == 2:
                 return Qt.ItemIsEnabled | Qt.ItemIsSelectable
@@ -410,74 +481,115 @@ class StandardItemModelMainFields(QStandardItemModel):
         if not index.isValid():
             return Qt.ItemIsEnabled
 
-        # Update the row in the table
-        row = index.row()
-        col = index.column()
-        field = self.mdl.list_of_fields[row]
-        FieldId = field.f_id
-
-        # Label
-        if col == 0:
-            new_plabel = from_qvariant(value, to_text_string)
-
-            # Since all fields' labels are using the phase label, we rename
-            # the labels in all formulas!
-            old_plabel = self._data[row][col]
-            for nf in self.mdl.case.xmlGetNodeList('formula'):
-                if nf:
-                    ftext = (str(nf).replace('<formula>','')).replace('</formula>','')
-                    nf.xmlSetTextNode(ftext.replace(old_plabel, new_plabel))
+        if self.__isUnchanged(index.row(), index.column(), value):
+            return False
 
-            self._data[row][col] = new_plabel
-            field.label = new_plabel
-            self.updateItem()
-
-        # Nature of field
-        elif col == 1:
-            new_nature = from_qvariant(value, to_text_string)
-            self._data[row][col] = new_nature
-            field.phase = new_nature
-            self.updateItem()
-
-        # Interfacial criterion
-        elif col == 2:
-            new_crit = from_qvariant(value, to_text_string)
-            self._data[row][col] = new_crit
-            self.mdl.setCriterion(FieldId, new_crit)
-            # update carrier field
-            self.updateItem()
-
-        # Carrier field
-        elif col == 3:
-            new_carrier = from_qvariant(value, to_text_string)
-            self._data[row][col] = new_carrier
-            # set carrier field Id in XML
-            if self._data[row][col] not in ["off", "all"] : # TODO move this test to model part ?
-               fid = self.mdl.getFieldId(self._data[row][col])
-            else :
-               fid = self._data[row][col]
-            field.carrier_id = fid
-
-        # Compressible
-        elif col == 4:
-            state = from_qvariant(value, int)
-            if state == Qt.Unchecked:
-                self._data[row][col] = "off"
-                field.compressible = "off"
-            else:
-                self._data[row][col] = "on"
-                field.compressible = "on"
-
-        # Energy resolution
-        elif col == 5:
-            state = from_qvariant(value, to_text_string)
-            self._data[row][col] = state
-            field.enthalpy_model = state
+        self.__setCellData(index.row(), index.column(), value)
+        self.__updateFlowSettings()
 
         self.dataChanged.emit(index, index)
         return True
 
 
+    def setBulkData(self, rows, col, value):
+        """
+        Set the same value in a given column for several rows,
+        with a single dataChanged signal.
+        """
+        rows = sorted(row for row in set(rows)
+                      if not self.__isUnchanged(row, col, value))
+        if not rows:
+            return
+
+        for row in rows:
+            self.__setCellData(row, col, value)
+        self.__updateFlowSettings()
+
+        self.dataChanged.emit(self.index(rows[0], col), self.index(rows[-1], col))
+
+
+    def __isUnchanged(self, row, col, value):
+        """
+        Check if a value is the one already stored in a cell.
+        """
+        if col == 4:
+            if from_qvariant(value, int) == Qt.Unchecked:
+                new_value = "off"
+            else:
+                new_value = "on"
+        else:
+            new_value = from_qvariant(value, to_text_string)
+        return new_value == self._data[row][col]
+
+
+    def __setCellData(self, row, col, value):
+        """
+        Update a cell of the table and the associated field.
+        """
+        self._col_setters[col](row, self.mdl.list_of_fields[row], value)
+
+
+    def __setLabel(self, row, field, value):
+        new_plabel = from_qvariant(value, to_text_string)
+
+        # Since all fields' labels are using the phase label, we rename
+        # the labels in all formulas!
+        old_plabel = self._data[row][0]
+        if new_plabel != old_plabel:
+            for nf in self._formula_nodes:
+                ftext = nf.xmlGetTextNode()
+                if ftext and old_plabel in ftext:
+                    nf.xmlSetTextNode(ftext.replace(old_plabel, new_plabel))
+
+        self._data[row][0] = new_plabel
+        field.label = new_plabel
+        self.label_set.discard(old_plabel)
+        self.label_set.add(new_plabel)
+        self.updateItem()
+
+
+    def __setNature(self, row, field, value):
+        new_nature = from_qvariant(value, to_text_string)
+        self._data[row][1] = new_nature
+        field.phase = new_nature
+        self.updateItem()
+
+
+    def __setCriterion(self, row, field, value):
+        new_crit = from_qvariant(value, to_text_string)
+        self._data[row][2] = new_crit
+        self.mdl.setCriterion(field.f_id, new_crit)
+        # update carrier field
+        self.updateItem()
+
+
+    def __setCarrier(self, row, field, value):
+        new_carrier = from_qvariant(value, to_text_string)
+        self._data[row][3] = new_carrier
+        # set carrier field Id in XML
+        if new_carrier not in ["off", "all"] : # TODO move this test to model part ?
+           fid = self.mdl.getFieldId(new_carrier)
+        else :
+           fid = new_carrier
+        field.carrier_id = fid
+
+
+    def __setCompressible(self, row, field, value):
+        state = from_qvariant(value, int)
+        if state == Qt.Unchecked:
+            self._data[row][4] = "off"
+            field.compressible = "off"
+        else:
+            self._data[row][4] = "on"
+            field.compressible = "on"
+
+
+    def __setEnergy(self, row, field, value):
+        state = from_qvariant(value, to_text_string)
+        self._data[row][5] = state
+        field.enthalpy_model = state
+
+
     def getData(self, index):
         row = index.row()
         return self._data[row]
@@ -491,6 +603,7 @@ class StandardItemModelMainFields(QStandardItemModel):
 
         field = self.mdl.addField(existing_fieldId)
         label = field.label
+        self.label_set.add(label)
         nature = field.phase
         criterion = field.flow_type
         carrier = self.mdl.getFieldFromId(field.carrier_id)
@@ -500,24 +613,36 @@ class StandardItemModelMainFields(QStandardItemModel):
 
         field = [label, nature, criterion, carrierLabel, compressible, energy]
 
+        self.beginInsertRows(QModelIndex(), row, row)
         self._data.append(field)
-        self.setRowCount(row+1)
+        self.endInsertRows()
+        self._formula_nodes = self.mdl.case.xmlGetNodeList('formula')
+        self.__updateFlowSettings()
 
 
-    def loadItem(self, label, nature, criterion, carrierLabel, compressible, energy):
+    def loadItems(self):
         """
-        Add/load a field in the model.
+        Load all existing fields in the model.
         """
-        row = self.rowCount()
-
-        field = [label, nature, criterion, carrierLabel, compressible, energy]
+        labels = _fieldLabelsById(self.mdl)
+        rows = []
+        for field in self.mdl.list_of_fields:
+            carrier = field.carrier_id
+            rows.append([field.label,
+                         field.phase,
+                         field.flow_type,
+                         labels.get(str(carrier), carrier),
+                         field.compressible,
+                         field.enthalpy_model])
 
-        self._data.append(field)
-        self.setRowCount(row+1)
+        self.beginResetModel()
+        self._data = rows
+        self.endResetModel()
 
 
     def updateItem(self):
         # update carrier field and criterion
+        labels = _fieldLabelsById(self.mdl)
         for i, field in enumerate(self.mdl.list_of_fields) :
             self._data[i][2] = field.flow_type
             # If field is continuous, ensure that carrier option is updated
@@ -525,19 +650,22 @@ class StandardItemModelMainFields(QStandardItemModel):
                 field.carrier_id = 'off'
 
             carrier_id = field.carrier_id
-            self._data[i][3] = self.mdl.getFieldFromId(carrier_id).label
+            self._data[i][3] = labels.get(str(carrier_id), carrier_id)
 
 
     def deleteItem(self, row):
         """
         Delete the row in the model.
         """
+        self.beginRemoveRows(QModelIndex(), row, row)
         del self._data[row]
+        self.endRemoveRows()
         field_to_delete = self.mdl.list_of_fields[row]
         self.mdl.deleteField(field_to_delete.f_id)
-        row = self.rowCount()
-        self.setRowCount(row-1)
+        self.label_set = set(self.mdl.getFieldLabelsList())
         self.updateItem()
+        self._formula_nodes = self.mdl.case.xmlGetNodeList('formula')
+        self.__updateFlowSettings()
 
 
 #-------------------------------------------------------------------------------
@@ -566,8 +694,7 @@ class MainFieldsView(QWidget, Ui_MainFields):
         # Main fields definition
         self.tableModelFields = StandardItemModelMainFields(self.mdl)
         self.tableViewFields.setModel(self.tableModelFields)
-        self.tableViewFields.resizeColumnsToContents()
-        self.tableViewFields.resizeRowsToContents()
+        # Rows and columns are resized by the headers' ResizeToContents mode
         if QT_API == "PYQT4":
             self.tableViewFields.verticalHeader().setResizeMode(QHeaderView.ResizeToContents)
             self.tableViewFields.horizontalHeader().setResizeMode(QHeaderView.ResizeToContents)
@@ -597,15 +724,7 @@ class MainFieldsView(QWidget, Ui_MainFields):
         else:
             self._initializePushButtons()
 
-        for field in self.mdl.list_of_fields:
-            label = field.label
-            nature = field.phase
-            criterion = field.flow_type
-            carrier = field.carrier_id
-            carrierLabel = self.mdl.getFieldFromId(carrier).label
-            compressible = field.compressible
-            energy = field.enthalpy_model
-            self.tableModelFields.loadItem(label, nature, criterion, carrierLabel, compressible, energy)
+        self.tableModelFields.loadItems()
         self.browser.configureTree(self.case)
 
         self.case.undoStartGlobal()
@@ -615,7 +734,7 @@ class MainFieldsView(QWidget, Ui_MainFields):
         self.pushButtonDelete.clicked.connect(self.slotDeleteField)
         self.tableModelFields.dataChanged.connect(self.dataChanged)
 
-        if len(self.mdl.getFieldIdList()) > 2:
+        if len(self.mdl.list_of_fields) > 2:
             self.pushButtonDelete.setEnabled(1)
         else:
             self.pushButtonDelete.setEnabled(0)
@@ -625,11 +744,6 @@ class MainFieldsView(QWidget, Ui_MainFields):
         self.pushButtonDelete.hide()
 
     def dataChanged(self, topLeft, bottomRight):
-        for row in range(topLeft.row(), bottomRight.row() + 1):
-            self.tableViewFields.resizeRowToContents(row)
-        for col in range(topLeft.column(), bottomRight.column() + 1):
-            self.tableViewFields.resizeColumnToContents(col)
-
         self.browser.configureTree(self.case)
 
 
@@ -641,7 +755,7 @@ class MainFieldsView(QWidget, Ui_MainFields):
         self.tableViewFields.clearSelection()
         self.tableModelFields.newItem()
 
-        if len(self.mdl.getFieldIdList()) > 2:
+        if len(self.mdl.list_of_fields) > 2:
             self.pushButtonDelete.setEnabled(1)
         else:
             self.pushButtonDelete.setEnabled(0)
@@ -656,10 +770,10 @@ class MainFieldsView(QWidget, Ui_MainFields):
         """
         row = self.tableViewFields.currentIndex().row()
         if row >= 0 :
-            log.debug("slotDeleteProfile -> %s" % row)
+            log.debug("slotDeleteProfile -> %s", row)
             self.tableModelFields.deleteItem(row)
 
-        if len(self.mdl.getFieldIdList()) > 2:
+        if len(self.mdl.list_of_fields) > 2:
             self.pushButtonDelete.setEnabled(1)
         else:
             self.pushButtonDelete.setEnabled(0)
@@ -88,57 +88,65 @@ if sGeomComponent != None:
 
 #-------------------------------------------------------------------------------
 
-def BoundaryGroup():
+def _collect_group(smesh_kind, geom_shape_name):
     """
-    Import groups of faces.
+    Return the selected SMESH groups of type smesh_kind, and the selected
+    GEOM groups of sub-shapes of type geom_shape_name, joined with 'or'.
     """
     if sMeshComponent is None and sGeomComponent is None:
         raise ValueError("Component SMESH and GEOM not found")
 
-    local = ""
-    if sg.SelectedCount() > 0:
-        for i in range (sg.SelectedCount()):
-            entry = sg.getSelected(i)
-            if entry != '':
-                sobj = aStudy.FindObjectID(entry)
-                if sobj != None:
-                    anObjectDS = sobj.GetObject()
-                    if anObjectDS !=  None:
-
-                        # check for smesh group
-                        aSmeshObject = anObjectDS._narrow(SMESH.SMESH_GroupBase)
-                        #if aSmeshObject is None:
-                        #    aSmeshObject = anObjectDS._narrow(SMESH.SMESH_Group)
-                        #if aSmeshObject is None:
-                        #    aSmeshObject = anObjectDS._narrow(SMESH.SMESH_GroupOnGeom)
-                        if aSmeshObject != None and aSmeshObject.GetType() == SMESH.FACE:
-                            if not local:
-                                local = aSmeshObject.GetName()
-                            else:
-                                local += ' or ' + aSmeshObject.GetName()
-
-                        # check for geom group of faces
-                        aGeomObject = anObjectDS._narrow(GEOM.GEOM_Object)
-                        if aGeomObject != None and aGeomObject.GetType() == 37:
-                            # check the group
-                            # get all possible faces
-                            all_ids = geomBuilder.SubShapeAllIDs(aGeomObject.GetMainShape(), geomBuilder.ShapeType["FACE"])
-                            cur_ids = geomBuilder.GetObjectIDs(aGeomObject)
-                            isValid = len(cur_ids) > 0 # not include empty list
-                            if isValid:
-                                for face_id in cur_ids:
-                                    if not face_id in all_ids:
-                                        #invalid id
-                                        isValid = False
-                                        break
-
-                            if isValid:
-                                if not local:
-                                    local = aGeomObject.GetName()
-                                else:
-                                    local += ' or ' + aGeomObject.GetName()
-
-    log.debug("BoundaryGroup -> %s" % str(local))
+    names = []
+    all_ids_cache = {}
+    # snapshot the selection once (each query is a GUI round-trip)
+    entries = [sg.getSelected(i) for i in range(sg.SelectedCount())]
+    for entry in entries:
+        if entry != '':
+            sobj = aStudy.FindObjectID(entry)
+            if sobj != None:
+                anObjectDS = sobj.GetObject()
+                if anObjectDS !=  None:
+
+                    # check for smesh group
+                    aSmeshObject = anObjectDS._narrow(SMESH.SMESH_GroupBase)
+                    #if aSmeshObject is None:
+                    #    aSmeshObject = anObjectDS._narrow(SMESH.SMESH_Group)
+                    #if aSmeshObject is None:
+                    #    aSmeshObject = anObjectDS._narrow(SMESH.SMESH_GroupOnGeom)
+                    if aSmeshObject != None and aSmeshObject.GetType() == smesh_kind:
+                        names.append(aSmeshObject.GetName())
+                        # no need to query GEOM for a matching SMESH group
+                        continue
+
+                    # check for geom group of sub-shapes
+                    aGeomObject = anObjectDS._narrow(GEOM.GEOM_Object)
+                    if aGeomObject != None and aGeomObject.GetType() == 37:
+                        # check the group
+                        # get all possible sub-shapes
+                        # (cached per main shape, as groups often share it)
+                        main_shape = aGeomObject.GetMainShape()
+                        key = main_shape.GetEntry()
+                        all_ids = all_ids_cache.get(key)
+                        if all_ids is None:
+                            all_ids = frozenset(geomBuilder.SubShapeAllIDs(main_shape, geomBuilder.ShapeType[geom_shape_name]))
+                            all_ids_cache[key] = all_ids
+                        cur_ids = geomBuilder.GetObjectIDs(aGeomObject)
+                        # not include empty list
+                        isValid = len(cur_ids) > 0 and all(shape_id in all_ids for shape_id in cur_ids)
+
+                        if isValid:
+                            names.append(aGeomObject.GetName())
+
+    return " or ".join(names)
+
+
+def BoundaryGroup():
+    """
+    Import groups of faces.
+    """
+    local = _collect_group(SMESH.FACE, "FACE")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("BoundaryGroup -> %s", local)
     return local
 
 
@@ -146,49 +154,9 @@ def VolumeGroup():
     """
     Import groups of solid.
     """
-    if sMeshComponent is None and sGeomComponent is None:
-        raise ValueError("Component SMESH and GEOM not found")
-
-    local = ""
-    if sg.SelectedCount() > 0:
-        for i in range (sg.SelectedCount()):
-            entry = sg.getSelected(i)
-            if entry != '':
-                sobj = aStudy.FindObjectID(entry)
-                if sobj !=  None:
-                    anObjectDS = sobj.GetObject()
-                    #check for smesh group
-                    if anObjectDS !=  None:
-                        #aSmeshObject = anObjectDS._narrow(SMESH.SMESH_Group)
-                        aSmeshObject = anObjectDS._narrow(SMESH.SMESH_GroupBase)
-                        if aSmeshObject != None and aSmeshObject.GetType() == SMESH.VOLUME:
-                            if not local:
-                                local = aSmeshObject.GetName()
-                            else:
-                                local += ' or ' + aSmeshObject.GetName()
-
-                        # check for geom group of volumes
-                        aGeomObject = anObjectDS._narrow(GEOM.GEOM_Object)
-                        if aGeomObject != None and aGeomObject.GetType() == 37:
-                            # check the group
-                            # get all possible volumes
-                            all_ids = geomBuilder.SubShapeAllIDs(aGeomObject.GetMainShape(), geomBuilder.ShapeType["SOLID"])
-                            cur_ids = geomBuilder.GetObjectIDs(aGeomObject)
-                            isValid = len(cur_ids) > 0 # not include empty list
-                            if isValid:
-                                for face_id in cur_ids:
-                                    if not face_id in all_ids:
-                                        # invalid id
-                                        isValid = False
-                                        break
-
-                            if isValid:
-                                if not local:
-                                    local = aGeomObject.GetName()
-                                else:
-                                    local += ' or ' + aGeomObject.GetName()
-
-    log.debug("VolumeGroup -> %s" % str(local))
+    local = _collect_group(SMESH.VOLUME, "SOLID")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("VolumeGroup -> %s", local)
     return local
 
 #-------------------------------------------------------------------------------
@@ -37,6 +37,25 @@ logging.basicConfig()
 log = logging.getLogger(__file__)
 log.setLevel(logging.NOTSET)
 
+#-------------------------------------------------------------------------------
+# Utility functions
+#-------------------------------------------------------------------------------
+
+def _write_if_changed(path, content):
+    """
+    Write content to a file, unless the file already has this content
+    (so that its time stamp does not trigger rebuilds of documents).
+    """
+    try:
+        with open(path, "r") as f:
+            if f.read() == content:
+                return
+    except OSError:
+        pass
+
+    with open(path, "w") as f:
+        f.write(content)
+
 #-------------------------------------------------------------------------------
 # class handling the metadata
 #-------------------------------------------------------------------------------
@@ -164,9 +183,8 @@ class study_metadata:
         if path and os.path.isdir(path):
             f2open = os.path.join(path, f2open)
 
-        with open(f2open, "w") as kwfile:
-            kw_str = '\\keywords{' + ', '.join(self.study['keywords']) + '}'
-            kwfile.write(kw_str)
+        kw_str = '\\keywords{' + ', '.join(self.study['keywords']) + '}'
+        _write_if_changed(f2open, kw_str)
 
     #---------------------------------------------------------------------------
 
@@ -180,11 +198,12 @@ class study_metadata:
         if path and os.path.isdir(path):
             f2open = os.path.join(path, f2open)
 
-        with open(f2open, 'w') as readmefile:
-            for c in self.cases:
-                readmefile.write(f'\\vnvcase[{c["name"]}:]\n')
-                for itm in c['vnvitem']:
-                    readmefile.write(f'\\vnvitem {itm}\n')
-                readmefile.write('\n')
+        lines = []
+        for c in self.cases:
+            lines.append(f'\\vnvcase[{c["name"]}:]\n')
+            for itm in c['vnvitem']:
+                lines.append(f'\\vnvitem {itm}\n')
+            lines.append('\n')
+        _write_if_changed(f2open, ''.join(lines))
 
 #-------------------------------------------------------------------------------
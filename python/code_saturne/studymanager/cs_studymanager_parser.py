@@ -80,6 +80,14 @@ class Parser(object):
         self.filename = XMLFileName
         self.__repo = None
         self.__dest = None
+        self.__study_nodes = None
+
+        # lookups repeated by the check, plot and report passes,
+        # cached per node (children are cached per node and markup)
+        self.__children = {}
+        self.__inputs = {}
+        self.__probes = {}
+        self.__postpro = {}
 
         if doc != None:
             self.doc = doc
@@ -145,6 +153,7 @@ class Parser(object):
         @rtype: C{DOM element}
         @return: new node I{childName}
         """
+        self.__children.clear()
         return father.appendChild(self.doc.createElement(childname))
 
     #---------------------------------------------------------------------------
@@ -181,7 +190,13 @@ class Parser(object):
         @rtype: C{List} of C{DOM element}
         @return: list of nodes I{childName}
         """
-        return father.getElementsByTagName(childname)
+        key = (father, childname)
+        l = self.__children.get(key)
+        if l is None:
+            l = father.getElementsByTagName(childname)
+            self.__children[key] = l
+
+        return l
 
     #---------------------------------------------------------------------------
 
@@ -267,18 +282,20 @@ class Parser(object):
         @rtype: C{DOM element}
         @return: node of the xml document for study I{l}
         """
-        node = None
+        # index study nodes by label (first occurrence) on first call,
+        # instead of walking the whole document for each query
+        if self.__study_nodes is None:
+            self.__study_nodes = {}
+            for n in self.root.getElementsByTagName("study"):
+                label = str(n.attributes["label"].value)
+                if label not in self.__study_nodes:
+                    self.__study_nodes[label] = n
 
-        for n in self.root.getElementsByTagName("study"):
-            label = str(n.attributes["label"].value)
-            if label == l:
-                if str(n.attributes["status"].value) != "on":
-                    raise ValueError("Error: the getStudyNode method is used with the study %s turned off " % l)
-                node = n
-                break
+        node = self.__study_nodes.get(l)
 
-            if not n:
-                raise ValueError("Error: the getStudyNode does not found the node of the study %s" % l)
+        if node is not None:
+            if str(node.attributes["status"].value) != "on":
+                raise ValueError("Error: the getStudyNode method is used with the study %s turned off " % l)
 
         return node
 
@@ -445,16 +462,19 @@ class Parser(object):
             </study>
         @type l: C{String}
         @param l: label of a study
-        @rtype: C{Dictionary}
-        @return: keywords and value.
+        @rtype: C{Generator} of C{Dictionary}
+        @return: keywords and value, for each case.
         """
-        data = []
         list_case = {}
         deprecated_option = False
 
         setup_filter_keys = ("notebook", "parametric", "kw_args")
 
-        for node in self.getStudyNode(l).getElementsByTagName("case"):
+        # study node and tags are common to all cases
+        study_node = self.getStudyNode(l)
+        study_tags = self.getStudyTags(study_node)
+
+        for node in study_node.getElementsByTagName("case"):
             if str(node.attributes["status"].value) == 'on':
 
                 d = {}
@@ -495,7 +515,7 @@ class Parser(object):
                 except:
                     d['tags'] = []
                 # add tags defined for the study
-                d['tags'] += self.getStudyTags(self.getStudyNode(l))
+                d['tags'] += study_tags
                 if len(d['tags']) == 0:
                     d['tags'] = None
 
@@ -530,7 +550,7 @@ class Parser(object):
                                 else:
                                     d[n.tagName] += " " + str(args)
 
-                data.append(d)
+                yield d
 
         if deprecated_option:
             msg = "\n WARNING: deprecated options (compute, compare or post)" + \
@@ -538,8 +558,6 @@ class Parser(object):
                   " --update-smgr.\n"
             print(msg)
 
-        return data
-
     #---------------------------------------------------------------------------
 
     def getCompare(self, caseNode):
@@ -702,6 +720,9 @@ class Parser(object):
         @rtype: C{List}, C{List}
         @return: C{List} of nodes <input>, and C{List} of file names
         """
+        if node in self.__inputs:
+            return self.__inputs[node]
+
         f  = str(node.attributes["file"].value)
 
         try:
@@ -717,6 +738,8 @@ class Parser(object):
         except:
             tex = None
 
+        self.__inputs[node] = (f, dest, repo, tex)
+
         return  f, dest, repo, tex
 
     #---------------------------------------------------------------------------
@@ -729,6 +752,9 @@ class Parser(object):
         @type node: C{DOM Element}
         @param node: node of the current case
         """
+        if node in self.__probes:
+            return self.__probes[node]
+
         f  = str(node.attributes["file"].value)
         try:
             dest  = str(node.attributes["dest"].value)
@@ -739,6 +765,8 @@ class Parser(object):
         except:
             fig = None
 
+        self.__probes[node] = (f, dest, fig)
+
         return f, dest, fig
 
     #---------------------------------------------------------------------------
@@ -794,6 +822,9 @@ class Parser(object):
         @rtype: C{List}
         @return: C{List} of list of nodes <postpro>
         """
+        if l in self.__postpro:
+            return self.__postpro[l]
+
         scripts, labels, nodes, args = [], [], [], []
 
         for node in self.getStudyNode(l).getElementsByTagName("postpro"):
@@ -809,6 +840,8 @@ class Parser(object):
             except:
                 args.append("")
 
+        self.__postpro[l] = (scripts, labels, nodes, args)
+
         return scripts, labels, nodes, args
 
 
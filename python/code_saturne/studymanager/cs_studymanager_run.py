@@ -39,6 +39,7 @@ import logging
 from code_saturne.base.cs_exec_environment import run_command
 from code_saturne.base.cs_exec_environment import separate_args
 from code_saturne.base.cs_exec_environment import enquote_arg
+from code_saturne.base.cs_exec_environment import assemble_args
 
 #-------------------------------------------------------------------------------
 # log config.
@@ -51,12 +52,17 @@ log.setLevel(logging.NOTSET)
 
 #-------------------------------------------------------------------------------
 
-def run_studymanager_command(_c, _log):
+def run_studymanager_command(_c, _log, cwd=None):
     """
-    Run command with arguments.
+    Run command with arguments, in directory cwd if given.
+    The command may be given as a string or a list of arguments.
     Redirection of the stdout or stderr of the command.
     """
-    assert type(_c) == str or type(_c) == unicode
+    if isinstance(_c, str):
+        cmd = separate_args(_c)
+    else:
+        cmd = list(_c)
+        _c = assemble_args(cmd)
 
     log.debug("run_studymanager_command: %s" % _c)
 
@@ -69,17 +75,16 @@ def run_studymanager_command(_c, _log):
         return "\n\nExecution failed --> %s: %s" \
                 "\n - command: %s"                \
                 "\n - directory: %s\n\n" %        \
-                (_t, str(retcode), _c, os.getcwd())
+                (_t, str(retcode), _c, cwd or os.getcwd())
 
     _l = ""
 
-    cmd = separate_args(_c)
-
     env = os.environ.copy()
 
     try:
         t1 = time.time()
-        retcode = run_command(cmd, stdout=_log, stderr=_log, env=env)
+        retcode = run_command(cmd, stdout=_log, stderr=_log, env=env,
+                              cwd=cwd)
         t2 = time.time()
 
         if retcode < 0:
@@ -27,7 +27,9 @@
 #-------------------------------------------------------------------------------
 
 import os, sys
-import shutil, re
+import shutil
+import copy
+import shlex
 import subprocess
 import threading
 import string
@@ -36,7 +38,10 @@ import logging
 import fnmatch
 import math
 import configparser
+import atexit
+import multiprocessing
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 #-------------------------------------------------------------------------------
 # Application modules import
@@ -47,19 +52,22 @@ from code_saturne.base import cs_create, cs_batch, cs_xml_reader
 from code_saturne.base.cs_case import case_state, get_case_state
 from code_saturne.base.cs_create import set_executable, create_local_launcher
 from code_saturne.base import cs_exec_environment, cs_run_conf
+from code_saturne.base.cs_exec_environment import separate_args
 
 from code_saturne.model import XMLengine
+from code_saturne.model.XMLinitialize import XMLinit as cs_solver_xml_init
+
+try:
+    from code_saturne.model.XMLinitializeNeptune import XMLinitNeptune as nc_solver_xml_init
+except ImportError:
+    # neptune_cfd may not be available
+    nc_solver_xml_init = None
+
 from code_saturne.studymanager.cs_studymanager_pathes_model import PathesModel
 
 from code_saturne.studymanager.cs_studymanager_parser import Parser
 from code_saturne.studymanager.cs_studymanager_texmaker import Report
 
-try:
-    from code_saturne.studymanager.cs_studymanager_drawing import Plotter
-except Exception:
-    print("Warning: import studymanager Plotter failed. Plotting disabled.\n")
-    pass
-
 from code_saturne.studymanager.cs_studymanager_run import run_studymanager_command
 from code_saturne.studymanager.cs_studymanager_xml_init import smgr_xml_init
 
@@ -72,6 +80,49 @@ log = logging.getLogger(__file__)
 #log.setLevel(logging.DEBUG)
 log.setLevel(logging.NOTSET)
 
+#-------------------------------------------------------------------------------
+# Output markers
+#-------------------------------------------------------------------------------
+
+# Markers of mesh size differences in cs_io_dump diff output
+_diff_size_markers = (b"Taille", b"Size")
+
+#-------------------------------------------------------------------------------
+# Report input file extensions
+#-------------------------------------------------------------------------------
+
+# inputs added to reports as figures
+_figure_extensions = ('.png', '.jpg', '.jpeg', '.pdf')
+
+# inputs copied in POST for description reports
+_input_extensions = ('.png', '.jpg', '.jpeg', '.pdf', '.tex')
+
+#-------------------------------------------------------------------------------
+# Case state report colors and messages
+#-------------------------------------------------------------------------------
+
+_state_colors = {case_state.UNKNOWN: "rgb(227,218,201)",
+                 case_state.STAGING: "rgb(255,191,0)",
+                 case_state.STAGED: "rgb(176,196,222)",
+                 case_state.PREPROCESSED: "rgb(216,191,216)",
+                 case_state.COMPUTED: "rgb(120,213,124)",
+                 case_state.FINALIZING: "rgb(127,255,0)",
+                 case_state.FINALIZED: "rgb(120,213,124)",
+                 case_state.RUNNING: "rgb(65,105,225)",
+                 case_state.EXCEEDED_TIME_LIMIT: "rgb(0,255,255)",
+                 case_state.FAILED: "rgb(250,128,114)"}
+
+_state_messages = {case_state.UNKNOWN: "Unknown",
+                   case_state.STAGING: "Staging",
+                   case_state.STAGED: "Staged",
+                   case_state.PREPROCESSED: "Preprocesses",
+                   case_state.COMPUTED: "OK",
+                   case_state.FINALIZING: "Finalizing",
+                   case_state.FINALIZED: "OK",
+                   case_state.RUNNING: "Running",
+                   case_state.EXCEEDED_TIME_LIMIT: "Time limit",
+                   case_state.FAILED: "FAILED"}
+
 #-------------------------------------------------------------------------------
 
 def nodot(item):
@@ -79,6 +130,273 @@ def nodot(item):
 
 #-------------------------------------------------------------------------------
 
+def _first_and_count(path):
+    """Return the first non-hidden entry (os.DirEntry) of a directory and
+       the number of such entries, counting stopping at 2.
+    """
+
+    first = None
+    count = 0
+    with os.scandir(path) as it:
+        for e in it:
+            if not nodot(e.name):
+                continue
+            count += 1
+            if first is None:
+                first = e
+            if count > 1:
+                break
+
+    return first, count
+
+# Compare file names as bytes when checking files
+_bytes_names = (os.name == 'posix')
+
+# Results folder summaries, indexed by (path, modification time)
+_resu_summary_cache = {}
+
+def _resu_summary(path):
+    """Return _first_and_count for a results folder, scanning it only
+       once while it is not modified (several cases share it).
+    """
+
+    key = (path, os.stat(path).st_mtime_ns)
+    summary = _resu_summary_cache.get(key)
+    if summary is None:
+        summary = _first_and_count(path)
+        _resu_summary_cache[key] = summary
+
+    return summary
+
+#-------------------------------------------------------------------------------
+
+# Number of report lines written to the studymanager log between flushes
+_log_flush_period = 64
+
+def _flush_log(log_file):
+    """Flush the studymanager log at exit, if it is still open.
+    """
+
+    if not log_file.closed:
+        log_file.flush()
+
+#-------------------------------------------------------------------------------
+
+def _copy_if_changed(src, dst):
+    """Copy a file with its permissions, unless the destination has the
+       same size and is not older than the source (as copies are not
+       given the source time, this means it was copied earlier).
+    """
+
+    try:
+        st_dst = os.stat(dst)
+    except FileNotFoundError:
+        return shutil.copy(src, dst)
+
+    st_src = os.stat(src)
+    if st_src.st_size == st_dst.st_size \
+       and st_src.st_mtime_ns <= st_dst.st_mtime_ns:
+        return dst
+
+    return shutil.copy(src, dst)
+
+#-------------------------------------------------------------------------------
+
+def _copy_file_contents(src, dst):
+    """Copy file contents only. Where available, os.copy_file_range lets
+       the file system share data blocks (reflink) or copy in the kernel;
+       otherwise, or if it fails, shutil.copyfile is used.
+    """
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as f_src, open(dst, 'wb') as f_dst:
+                n = os.fstat(f_src.fileno()).st_size
+                while n > 0:
+                    n_copied = os.copy_file_range(f_src.fileno(),
+                                                  f_dst.fileno(), n)
+                    if n_copied == 0:
+                        break
+                    n -= n_copied
+            if n == 0:
+                return dst
+        except OSError:
+            pass
+
+    return shutil.copyfile(src, dst)
+
+#-------------------------------------------------------------------------------
+
+# Coupled cases of a study share the launcher of the study destination,
+# and may be prepared concurrently
+_launcher_lock = threading.Lock()
+
+def create_study_launcher(pkg, dest):
+    """Create the local launcher of a study destination, one thread at
+       a time.
+    """
+
+    with _launcher_lock:
+        create_local_launcher(pkg, dest)
+
+#-------------------------------------------------------------------------------
+
+def _raise_error(error):
+    """Error handler for os.walk, so that errors are not ignored."""
+    raise error
+
+def copy_tree(src, dst):
+    """Copy a directory tree over an existing one, with file contents and
+       permissions only (shutil.copytree with copy2 also copies times and
+       extended attributes of each file, which are not needed here).
+       Files which are unchanged since an earlier copy are not copied again.
+       On Linux, file contents are copied in the kernel (sendfile).
+       Raises OSError on failure.
+    """
+
+    for root, dirs, files in os.walk(src, onerror=_raise_error,
+                                     followlinks=True):
+        dst_root = os.path.normpath(os.path.join(dst,
+                                                 os.path.relpath(root, src)))
+        os.makedirs(dst_root, exist_ok=True)
+        for f in files:
+            _copy_if_changed(os.path.join(root, f), os.path.join(dst_root, f))
+
+#-------------------------------------------------------------------------------
+
+# Parsed run.cfg files, indexed by (path, modification time, package id)
+_run_conf_cache = {}
+
+def load_run_conf(path, pkg):
+    """Return the run configuration read from path, reusing a previous
+       parse of the same (unmodified) file. The returned object is shared,
+       so it must not be modified.
+    """
+
+    key = (path, os.stat(path).st_mtime_ns, id(pkg))
+    run_conf = _run_conf_cache.get(key)
+    if run_conf is None:
+        run_conf = cs_run_conf.run_conf(path, package=pkg)
+        _run_conf_cache[key] = run_conf
+
+    return run_conf
+
+#-------------------------------------------------------------------------------
+
+# Batch objects (which read the install configuration), indexed by package id
+_batch_cache = {}
+
+def get_batch(pkg):
+    """Return a batch object for a package, built from a shared one
+       so that the install configuration is read only once. Job
+       parameters are not shared, as they are filled by parsing.
+    """
+
+    batch = _batch_cache.get(id(pkg))
+    if batch is None:
+        batch = cs_batch.batch(pkg)
+        _batch_cache[id(pkg)] = batch
+
+    batch = copy.copy(batch)
+    batch.params = dict(batch.params)
+
+    return batch
+
+#-------------------------------------------------------------------------------
+
+# Restart paths read from setup files, indexed by (path, modification time)
+_restart_path_cache = {}
+
+def get_restart_path(data_file):
+    """Return the restart path defined in a setup file (or None), parsing
+       it only once while it is not modified (runs of a same case share it).
+       Format <restart path="../CASE/RESU/run_id/checkpoint"/>
+    """
+
+    key = (data_file, os.stat(data_file).st_mtime_ns)
+    if key in _restart_path_cache:
+        return _restart_path_cache[key]
+
+    path = None
+    data = cs_xml_reader.Parser(fileName = data_file)
+    calc_node = cs_xml_reader.getChildNode(data.root,
+                                           'calculation_management')
+    if calc_node != None:
+        sr_node = cs_xml_reader.getChildNode(calc_node, 'start_restart')
+        if sr_node != None:
+           node = cs_xml_reader.getChildNode(sr_node, 'restart')
+           if node != None:
+               path = str(node.getAttribute('path'))
+
+    _restart_path_cache[key] = path
+
+    return path
+
+#-------------------------------------------------------------------------------
+
+# Postprocessing executables from the install configuration, by package id
+_postprocessing_exec_cache = {}
+
+def get_postprocessing_exec(pkg):
+    """Return the studymanager postprocessing executable defined in the
+       install configuration of a package (or None), reading the
+       configuration files only once.
+    """
+
+    if id(pkg) not in _postprocessing_exec_cache:
+        e = None
+        config = configparser.ConfigParser()
+        config.read(pkg.get_configfiles())
+        if config.has_option('studymanager', 'postprocessing_exec'):
+            e = config.get('studymanager', 'postprocessing_exec')
+        _postprocessing_exec_cache[id(pkg)] = e
+
+    return _postprocessing_exec_cache[id(pkg)]
+
+#-------------------------------------------------------------------------------
+
+# Files to compile, indexed by (source directory, modification time)
+_files_to_compile_cache = {}
+
+def cached_files_to_compile(src_dir):
+    """Return files to compile in a source directory, listing it only
+       once while it is not modified (case runs may share sources).
+    """
+
+    key = (src_dir, os.stat(src_dir).st_mtime_ns)
+    src_files = _files_to_compile_cache.get(key)
+    if src_files is None:
+        src_files = files_to_compile(src_dir)
+        _files_to_compile_cache[key] = src_files
+
+    return src_files
+
+#-------------------------------------------------------------------------------
+
+# States of dependency run folders, indexed by (run folder, coupling)
+_case_state_cache = {}
+
+def get_dependency_state(run_folder, coupling):
+    """Return the state of a run folder on which cases depend, querying
+       it only once for all cases depending on it.
+    """
+
+    key = (run_folder, coupling)
+    state = _case_state_cache.get(key)
+    if state is None:
+        state = get_case_state(run_folder, coupling=coupling, run_timeout=3600)
+        _case_state_cache[key] = state
+
+    return state
+
+def clear_case_state_cache():
+    """Forget cached dependency run folder states.
+    """
+
+    _case_state_cache.clear()
+
+#-------------------------------------------------------------------------------
+
 def create_base_xml_file(filepath, pkg):
     """Create studymanager XML file.
     """
@@ -113,14 +431,10 @@ def init_xml_file_with_study(smgr, studyp, pkg):
     st_node = smgr_node.xmlInitChildNode('study', label = studyd)
     st_node['status'] = "on"
 
-    cases = []
-    for elt in os.listdir(studyp):
-        eltd = os.path.join(studyp, elt)
-        if os.path.isdir(eltd):
-            if isCase(eltd, pkg):
-                cases.append(elt)
+    with os.scandir(studyp) as it:
+        cases = sorted(e.name for e in it
+                       if e.is_dir() and isCase(e.path, pkg))
 
-    cases.sort()
     for case in cases:
         c_node = st_node.xmlInitChildNode("case", label = case)
         c_node['status']  = "on"
@@ -129,26 +443,57 @@ def init_xml_file_with_study(smgr, studyp, pkg):
 
 #-------------------------------------------------------------------------------
 
+def _xml_root_may_match(xml_file, root_tags):
+    """Quick check on the beginning of an XML file, to avoid parsing
+       files whose root element is none of root_tags.
+       If the file starts with a long comment, the check is inconclusive
+       and True is returned.
+    """
+
+    try:
+        with open(xml_file, 'rb') as f:
+            head = f.read(4096)
+    except OSError:
+        return False
+
+    for tag in root_tags:
+        if b'<' + tag in head:
+            return True
+
+    return b'<!--' in head
+
+#-------------------------------------------------------------------------------
+
+def _xml_files(dirpath):
+    """Return the list of paths of XML files in a directory.
+    """
+
+    try:
+        with os.scandir(dirpath) as it:
+            return [e.path for e in it
+                    if e.name.endswith('.xml') and e.is_file()]
+    except OSError:
+        return []
+
+#-------------------------------------------------------------------------------
+
 def isStudy(dirpath, pkg):
     """Try to determine if dirpath is a code_saturne study directory.
        True if a studymanager xml file is found
     """
 
-    is_study = False
-    if os.path.isdir(dirpath):
-        for elt in os.listdir(dirpath):
-            if ".xml" in str(elt):
-                xml_file = os.path.join(dirpath, elt)
-                if os.path.isfile(xml_file):
-                    try:
-                        smgr = XMLengine.Case(package=pkg, file_name=xml_file,
-                                              studymanager=True)
-                        Parser(xml_file, doc=smgr.doc)
-                        is_study = True
-                    except:
-                        pass
+    for xml_file in _xml_files(dirpath):
+        if not _xml_root_may_match(xml_file, (b'studymanager',)):
+            continue
+        try:
+            smgr = XMLengine.Case(package=pkg, file_name=xml_file,
+                                  studymanager=True)
+            Parser(xml_file, doc=smgr.doc)
+            return True
+        except:
+            pass
 
-    return is_study
+    return False
 
 #-------------------------------------------------------------------------------
 
@@ -160,20 +505,88 @@ def isCase(dirpath, pkg):
     # Verify that DATA folder exists with a xml file inside
     datad = os.path.join(dirpath, 'DATA')
 
-    is_case = False
-    if os.path.isdir(datad):
-        for elt in os.listdir(datad):
-            if ".xml" in str(elt):
-                xml_file = os.path.join(datad, elt)
-                if os.path.isfile(xml_file):
-                    try:
-                        setup = XMLengine.Case(package=pkg, file_name=xml_file)
-                        cs_xml_reader.Parser(fileName = xml_file)
-                        is_case = True
-                    except:
-                        pass
+    for xml_file in _xml_files(datad):
+        if not _xml_root_may_match(xml_file, (b'Code_Saturne_GUI',
+                                              b'NEPTUNE_CFD_GUI')):
+            continue
+        try:
+            setup = XMLengine.Case(package=pkg, file_name=xml_file)
+            cs_xml_reader.Parser(fileName = xml_file)
+            return True
+        except:
+            pass
+
+    return False
+
+#-------------------------------------------------------------------------------
+
+def update_setup_files(pkg, data_dirs):
+    """Update setup files in the given DATA directories of a case.
+       This only depends on its arguments, so as to be run in a
+       worker process.
+    """
+
+    # list all DATA directories first, as setup files are rewritten
+    data_entries = []
+    for d in data_dirs:
+        with os.scandir(d) as it:
+            data_entries.append(list(it))
+
+    error = None
+    for entries in data_entries:
+        error = _update_setup_entries(pkg, entries)
+
+    return error
+
+#-------------------------------------------------------------------------------
+
+def _update_setup_entries(pkg, data_entries):
+    """Update setup files among the entries of a DATA directory.
+    """
+    # Load setup.xml file in order to update it
+    # with the __backwardCompatibility method.
+
+    msg = None
+    for entry in data_entries:
+        fp = entry.path
+        if entry.name.endswith('.xml') and entry.is_file():
+            try:
+                with open(fp, 'rb') as f:
+                    l = f.read(80)
+            except Exception:
+                continue
+            xml_type = None
+            if l.startswith(b'''<?xml version="1.0" encoding="utf-8"?><Code_Saturne_GUI'''):
+                xml_type = 'code_saturne'
+            elif l.startswith(b'''<?xml version="1.0" encoding="utf-8"?><NEPTUNE_CFD_GUI'''):
+                xml_type = 'neptune_cfd'
+            else:
+                continue
+            try:
+                case = XMLengine.Case(package = pkg, file_name = fp)
+            except:
+                msg = "Parameters file reading error.\n" \
+                    + "This file is not in accordance with XML specifications."
+                return msg
+
+            case['xmlfile'] = fp
+            case.xmlCleanAllBlank(case.xmlRootNode())
+
+            if xml_type == 'code_saturne':
+                cs_solver_xml_init(case).initialize()
+            elif xml_type == 'neptune_cfd':
+                if nc_solver_xml_init is not None:
+                    nc_solver_xml_init(case).initialize()
+                else:
+                    # Avoid completely failing an update of cases with
+                    # mixed solver types when neptune_cfd is not available
+                    # (will fail if really trying to run those cases)
+                    msg = "Failed updating a neptune_cfd XML file as " \
+                        + "neptune_cfd is not available."
+
+            case.xmlSaveDocument()
 
-    return is_case
+    return msg
 
 #===============================================================================
 # Case class
@@ -234,14 +647,12 @@ class Case(object):
         self.m_size_eq     = True # mesh sizes equal (in case of comparison)
         self.subdomains    = None
         self.level         = None # level of the node in the dependency graph
+        self.tags          = None # set of tags of the case (set by Study)
         self.job_id        = None
 
-        # Run_dir and Title are based on study, label and run_id
+        self._file_names   = {} # names of files in checked folders, by path
+
         self.resu = "RESU"
-        self.run_dir = os.path.join(self.__dest, self.label, self.resu,
-                                    self.run_id)
-        self.title = self.study + "/" + self.label + "/" +  self.resu + "/" \
-                   + self.run_id
 
         # Check for coupling
         # TODO: use run.cfg info, so as to allow another coupling parameters
@@ -251,7 +662,7 @@ class Case(object):
         run_conf = None
         run_config_path = os.path.join(self.__repo, self.label, "run.cfg")
         if os.path.isfile(run_config_path):
-            run_conf = cs_run_conf.run_conf(run_config_path, package=self.pkg)
+            run_conf = load_run_conf(run_config_path, self.pkg)
             if run_conf.get("setup", "coupled_domains") != None:
                 coupling = True
 
@@ -269,15 +680,31 @@ class Case(object):
                 if d['solver'].lower() in ('code_saturne', 'neptune_cfd'):
                     self.subdomains.append(d['domain'])
 
-            self.run_dir = os.path.join(self.__dest, self.label, self.resu,
-                                        self.run_id)
+        # Run_dir and Title are based on study, label and run_id
+        # (simple path components, so joined directly)
+        self.run_dir = f"{self.__dest}{os.sep}{self.label}" \
+                       f"{os.sep}{self.resu}{os.sep}{self.run_id}"
+        self.title = f"{self.study}/{self.label}/{self.resu}/{self.run_id}"
+
+        # RESU folders of the case in repository and destination
+        self._resu_repo = os.path.join(self.__repo, self.label, self.resu)
+        self._resu_dest = os.path.join(self.__dest, self.label, self.resu)
 
-            self.title = self.study + "/" + self.label + "/" +  self.resu \
-                       + "/" + self.run_id
+        # Quoted run_dir and log file for batch scripts
+        self._run_dir_q = shlex.quote(self.run_dir)
+        self._run_log_q = shlex.quote(os.path.join(self.run_dir,
+                                                   "run_case.log"))
 
         self.exe = os.path.join(pkg.get_dir('bindir'),
                                 pkg.name + pkg.config.shext)
 
+        # Common part of stage and run commands
+        cmd_args = ("--case", os.path.join(self.__repo, self.label),
+                    "--dest", self.__dest,
+                    "--id", self.run_id)
+        self._stage_prefix = (self.exe, "run", "--stage") + cmd_args
+        self._nostage_prefix = (self.exe, "run", "--no-stage") + cmd_args
+
         # Query number of processes and expected computation time
 
         if not self.n_procs or not self.expected_time:
@@ -285,8 +712,7 @@ class Case(object):
                 run_config_path = os.path.join(self.__repo, self.label,
                                                "DATA", "run.cfg")
                 if os.path.isfile(run_config_path):
-                    run_conf = cs_run_conf.run_conf(run_config_path,
-                                                    package=self.pkg)
+                    run_conf = load_run_conf(run_config_path, self.pkg)
 
             if resource_config:
                 config = self.__query_config__(run_conf, resource_config)
@@ -297,6 +723,14 @@ class Case(object):
                 if not self.expected_time:
                     self.expected_time = config[1]
 
+        # expected time in minutes, converted once for batch time sums
+        if self.expected_time is not None:
+            self.expected_time = float(self.expected_time)
+
+        # number of processes, converted once for graph filters
+        if self.n_procs is not None:
+            self.n_procs = int(self.n_procs)
+
         # Check for dependency
         # Dependancy given in smgr xml file overwrites parametric arguments
         # or dependency defined in setup.xml
@@ -322,59 +756,63 @@ class Case(object):
             return [int(resource_config['resource_n_procs']),
                     int(resource_config['resource_exp_time'])]
 
-        specific_resource_name_rid = ""
-        specific_resource_name_tag = []
-        resource_name = resource_config['resource_name']
+        sections = run_conf.sections
+        run_id_lc = self.run_id.lower()
+        tags_lc = [tag.lower() for tag in tags]
+
+        def _specific_names(name):
+            """
+            Return run_id and tag specific section names for a resource.
+            """
+            return (name + "/run_id=" + run_id_lc,
+                    [name + "/tag=" + tag for tag in tags_lc])
 
         # Try to find specific configuration with run_id in the form
         # [<resource>/run_id=<run_id>] otherwise use classical resource
         # also try to find specific configuration with tag in the form
         # [<resource>/tag=<run_id>] otherwise use classical resource
 
+        resource_name = resource_config['resource_name']
         if resource_name:
             resource_name = resource_name.lower()
-            specific_resource_name_rid = resource_name + "/run_id=" + self.run_id.lower()
-            for tag in tags:
-                specific_resource_name_tag.append(resource_name + "/tag=" + tag.lower())
-            common_tag = [tmp for tmp in specific_resource_name_tag if tmp in run_conf.sections]
-
-        if not resource_name \
-           or (not resource_name in run_conf.sections and not common_tag
-               and not specific_resource_name_rid in run_conf.sections):
-            resource_name = resource_config['batch_name']
-            if resource_name:
-                specific_resource_name_rid = resource_name + "/run_id=" + self.run_id.lower()
-                specific_resource_name_tag = []
-                for tag in tags:
-                    specific_resource_name_tag.append(resource_name + "/tag=" + tag.lower())
-            common_tag = [tmp for tmp in specific_resource_name_tag if tmp in run_conf.sections]
-            if not resource_name \
-               or (not resource_name in run_conf.sections and not common_tag
-                   and not specific_resource_name_rid in run_conf.sections):
-                resource_name = 'job_defaults'
-
-        specific_resource_name_rid = resource_name + "/run_id=" + self.run_id.lower()
-        specific_resource_name_tag = []
-        for tag in tags:
-            specific_resource_name_tag.append(resource_name + "/tag=" + tag.lower())
+
+        candidates = (resource_name, resource_config['batch_name'])
+        resource_name = 'job_defaults'
+        for candidate in candidates:
+            if not candidate:
+                continue
+            specific_resource_name_rid, specific_resource_name_tag \
+                = _specific_names(candidate)
+            if candidate in sections \
+               or specific_resource_name_rid in sections \
+               or any(tmp in sections for tmp in specific_resource_name_tag):
+                resource_name = candidate
+                break
+
+        specific_resource_name_rid, specific_resource_name_tag \
+            = _specific_names(resource_name)
 
         # specific resource defined with run_id dominates over tag
-        if specific_resource_name_rid in run_conf.sections:
+        if specific_resource_name_rid in sections:
             resource_name = specific_resource_name_rid
         else:
-            common_tag = [tmp for tmp in specific_resource_name_tag if tmp in run_conf.sections]
+            common_tag = next((tmp for tmp in specific_resource_name_tag
+                               if tmp in sections), None)
             if common_tag:
-                resource_name = str(common_tag[0])
+                resource_name = str(common_tag)
+
+        # keys of the selected section
+        section = sections.get(resource_name, {})
 
-        n_procs = run_conf.get(resource_name, 'n_procs')
+        n_procs = section.get('n_procs')
         if n_procs == None:
             self.job_header_lines = None
             if resource_config['batch']:
-                job_header = run_conf.get(resource_name, 'job_header')
+                job_header = section.get('job_header')
                 if job_header != None:
-                    job_header_lines = job_header.split(os.linesep)
+                    job_header_lines = str(job_header).split(os.linesep)
                     if job_header_lines != None:
-                        batch = cs_batch.batch(self.pkg)
+                        batch = get_batch(self.pkg)
                         n_procs = batch.get_n_procs(job_header_lines)
 
         if n_procs == None:
@@ -383,14 +821,16 @@ class Case(object):
         if not n_procs:
             n_procs = resource_config['resource_n_procs']
 
-        expected_time = run_conf.get(resource_name, 'expected_time')
-        if expected_time:
-            # Convert expected time in minutes
-            tmp = str(expected_time)
-            ind = tmp.find(":")
-            expected_time = int(tmp[:ind]) * 60 + int(tmp[-2:])
-        else:
+        expected_time = section.get('expected_time')
+        if not expected_time:
             expected_time = resource_config['resource_exp_time']
+        elif not isinstance(expected_time, int):
+            # Convert expected time ("HH:MM") in minutes
+            h, sep, m = str(expected_time).partition(":")
+            if sep:
+                expected_time = int(h) * 60 + int(m)
+            else:
+                expected_time = int(h)
 
         n_procs = int(n_procs)
         expected_time = int(expected_time)
@@ -410,26 +850,23 @@ class Case(object):
         depends = None
 
         # Check dependency in DATA/setup.xml
-        data_file = ""
+        data_file = None
         data_folder = os.path.join(self.__repo, self.label, "DATA")
-        if os.path.isdir(data_folder):
-            dir_list = os.listdir(data_folder)
-            if "setup.xml" in dir_list:
-                data_file = os.path.join(self.__repo, self.label, "DATA",
-                                         "setup.xml")
+        try:
+            with os.scandir(data_folder) as it:
+                for entry in it:
+                    if entry.name == "setup.xml":
+                        if entry.is_file():
+                            data_file = entry.path
+                        break
+        except OSError:
+            pass
+
         # Read setup.xml
         # Format <restart path="../CASE/RESU/run_id/checkpoint"/>
         path = None
-        if os.path.isfile(data_file):
-            data = cs_xml_reader.Parser(fileName = data_file)
-            calc_node = cs_xml_reader.getChildNode(data.root,
-                                                   'calculation_management')
-            if calc_node != None:
-                sr_node = cs_xml_reader.getChildNode(calc_node, 'start_restart')
-                if sr_node != None:
-                   node = cs_xml_reader.getChildNode(sr_node, 'restart')
-                   if node != None:
-                       path = str(node.getAttribute('path'))
+        if data_file:
+            path = get_restart_path(data_file)
 
         # Convert path in smgr dependency (STUDY/CASE/run_id)
         if path:
@@ -461,9 +898,7 @@ class Case(object):
             run_folder = os.path.normpath(run_tmp)
             if os.path.isdir(run_folder):
                 is_coupling = self.subdomains != None
-                state, info = get_case_state(run_folder,
-                                             coupling=is_coupling,
-                                             run_timeout=3600)
+                state, info = get_dependency_state(run_folder, is_coupling)
 
                 if state == case_state.FINALIZED:
                     # no dependency as run already finished
@@ -483,16 +918,44 @@ class Case(object):
 
     #---------------------------------------------------------------------------
 
+    def __build_stage_cmd(self):
+        """
+        Define stage command (as a list of arguments).
+        """
+
+        cmd = list(self._stage_prefix)
+
+        if self.notebook:
+            cmd += ["--notebook-args"] + separate_args(self.notebook)
+
+        if self.parametric:
+            cmd += ["--parametric-args", self.parametric]
+
+        if self.kw_args:
+            if self.kw_args.find(" ") < 0:
+                self.kw_args += " "  # workaround for arg-parser issue
+            cmd += ["--kw-args", self.kw_args]
+
+        return cmd
+
+    #---------------------------------------------------------------------------
+
     def prepare_run_folder(self):
         """
         Prepare a run folder in destination directory run_dir
         """
         log_lines = []
-        e = os.path.join(self.pkg.get_dir('bindir'), self.exe)
-        home = os.getcwd()
-        os.chdir(self.__dest)
+
+        # Check if case has already been prepared in dest/STUDY/CASE;
+        # staging would then fail, so it is skipped directly
 
         have_status_prepared = False
+        if not self.subdomains:
+            if os.path.isfile(os.path.join(self.run_dir, "run_status.prepared")):
+                have_status_prepared = True
+                if os.path.isfile(os.path.join(self.run_dir, "run_case.log")):
+                    log_lines += ['      * prepare run folder: {0} --> SKIPPED (already prepared)'.format(self.title)]
+                    return log_lines
 
         # Create log file in dest (will be moved later and renamed to
         # run_case.log, but named with run_id here in case of asynchronous
@@ -501,71 +964,38 @@ class Case(object):
         log_path = os.path.join(self.__dest, "run_" + self.label
                                 + "_" + self.run_id + ".log")
 
-        log_run = open(log_path, mode='w')
+        with open(log_path, mode='w') as log_run:
 
-        if self.subdomains:
-            if not os.path.isdir(self.label):
-                os.mkdir(self.label)
-            os.chdir(self.label)
-            refdir = os.path.join(self.__repo, self.label)
-            retval = 1
-            resu_coupling = None
-            for node in os.listdir(refdir):
-                ref = os.path.join(self.__repo, self.label, node)
-
-                # only loop on code_saturne subdomains
-                if node in self.subdomains:
-
-                    # generate folder in dest/STUDY/CASE/RESU_COUPLING/
-                    cmd = e + " run --stage --case " + refdir \
-                            + " --dest " + self.__dest \
-                            + " --id " + self.run_id
-
-                    if self.notebook:
-                        cmd += " --notebook-args " + self.notebook
+            if self.subdomains:
+                case_dir = os.path.join(self.__dest, self.label)
+                os.makedirs(case_dir, exist_ok=True)
+                refdir = os.path.join(self.__repo, self.label)
+                retval = 1
+                resu_coupling = None
+                for node in os.listdir(refdir):
+                    ref = os.path.join(self.__repo, self.label, node)
 
-                    if self.parametric:
-                        cmd += " --parametric-args " + '"' + self.parametric + '"'
+                    # only loop on code_saturne subdomains
+                    if node in self.subdomains:
 
-                    if self.kw_args:
-                        if self.kw_args.find(" ") < 0:
-                            self.kw_args += " "  # workaround for arg-parser issue
-                        cmd += " --kw-args " + '"' + self.kw_args + '"'
+                        # generate folder in dest/STUDY/CASE/RESU_COUPLING/
+                        cmd = self.__build_stage_cmd()
 
-                    node_retval, t = run_studymanager_command(cmd, log_run)
+                        node_retval, t = run_studymanager_command(cmd, log_run,
+                                                                  cwd=case_dir)
 
-                    # negative retcode is kept
-                    retval = min(node_retval,retval)
-
-                elif not os.path.isdir(ref):
-                    shutil.copy2(ref, node)
-
-            create_local_launcher(self.pkg, self.__dest)
-            os.chdir(self.__dest)
-        else:
-            refdir = os.path.join(self.__repo, self.label)
+                        # negative retcode is kept
+                        retval = min(node_retval,retval)
 
-            cmd = e + " run --stage --case " + refdir \
-                    + " --dest " + self.__dest \
-                    + " --id " + self.run_id
+                    elif not os.path.isdir(ref):
+                        shutil.copy2(ref, os.path.join(case_dir, node))
 
-            if self.notebook:
-                cmd += " --notebook-args " + self.notebook
-
-            if self.parametric:
-                cmd += " --parametric-args " + '"' + self.parametric + '"'
-
-            if self.kw_args:
-                if self.kw_args.find(" ") < 0:
-                    self.kw_args += " "  # workaround for arg-parser issue
-                cmd += " --kw-args " + '"' + self.kw_args + '"'
-
-            # Check if case has already been prepared in dest/STUDY/CASE
-
-            if os.path.isfile(os.path.join(self.run_dir, "run_status.prepared")):
-                have_status_prepared = True
+                create_study_launcher(self.pkg, self.__dest)
+            else:
+                cmd = self.__build_stage_cmd()
 
-            retval, t = run_studymanager_command(cmd, log_run)
+                retval, t = run_studymanager_command(cmd, log_run,
+                                                     cwd=self.__dest)
 
         if retval == 0:
             log_lines += ['      * prepare run folder: {0} --> OK ({1} s)'.format(self.title, str(t))]
@@ -592,76 +1022,14 @@ class Case(object):
                 log_lines += ['        - see ' + log_path]
                 self.compute = False
 
-        os.chdir(home)
         return log_lines
 
     #---------------------------------------------------------------------------
 
-    def __update_setup(self, subdir):
+    def setup_data_dirs(self):
         """
-        Update setup file in the Repository.
+        Return the DATA directories of the case in the Repository.
         """
-        # Load setup.xml file in order to update it
-        # with the __backwardCompatibility method.
-
-        from code_saturne.model.XMLengine import Case
-
-        msg = None
-        for fn in os.listdir(os.path.join(self.__repo, subdir, "DATA")):
-            fp = os.path.join(self.__repo, subdir, "DATA", fn)
-            if os.path.isfile(fp):
-                try:
-                    fd = os.open(fp , os.O_RDONLY)
-                    f = os.fdopen(fd)
-                    l = f.readline()
-                    f.close()
-                except Exception:
-                    continue
-                xml_type = None
-                if l.startswith('''<?xml version="1.0" encoding="utf-8"?><Code_Saturne_GUI'''):
-                    xml_type = 'code_saturne'
-                elif l.startswith('''<?xml version="1.0" encoding="utf-8"?><NEPTUNE_CFD_GUI'''):
-                    xml_type = 'neptune_cfd'
-                else:
-                    continue
-                try:
-                    case = Case(package = self.pkg, file_name = fp)
-                except:
-                    msg = "Parameters file reading error.\n" \
-                        + "This file is not in accordance with XML specifications."
-                    return msg
-
-                case['xmlfile'] = fp
-                case.xmlCleanAllBlank(case.xmlRootNode())
-
-                if xml_type == 'code_saturne':
-                    from code_saturne.model.XMLinitialize import XMLinit as cs_solver_xml_init
-                    cs_solver_xml_init(case).initialize()
-                elif xml_type == 'neptune_cfd':
-                    try:
-                        from code_saturne.model.XMLinitializeNeptune import XMLinitNeptune as nc_solver_xml_init
-                        nc_solver_xml_init(case).initialize()
-                    except ImportError:
-                        # Avoid completely failing an update of cases with
-                        # mixed solver types when neptune_cfd is not available
-                        # (will fail if really trying to run those cases)
-                        msg = "Failed updating a neptune_cfd XML file as " \
-                            + "neptune_cfd is not available."
-                        pass
-
-                case.xmlSaveDocument()
-
-        return msg
-
-    #---------------------------------------------------------------------------
-
-    def update(self):
-        """
-        Update path for the script in the Repository.
-        """
-        # Load the setup file in order to update it
-        # with the __backwardCompatibility method.
-
         if self.subdomains:
             cdirs = []
             for d in self.subdomains:
@@ -669,11 +1037,15 @@ class Case(object):
         else:
             cdirs = (self.label,)
 
-        error = None
-        for d in cdirs:
-            error = self.__update_setup(d)
+        return [os.path.join(self.__repo, d, "DATA") for d in cdirs]
+
+    #---------------------------------------------------------------------------
 
-        return error
+    def update(self):
+        """
+        Update path for the script in the Repository.
+        """
+        return update_setup_files(self.pkg, self.setup_data_dirs())
 
     #---------------------------------------------------------------------------
 
@@ -699,7 +1071,7 @@ class Case(object):
 
         # loop over subdomains
         for s in sdirs:
-            src_files = files_to_compile(s)
+            src_files = cached_files_to_compile(s)
 
             if len(src_files) > 0:
                 self.is_compiled = "OK"
@@ -715,34 +1087,27 @@ class Case(object):
 
     def build_run_cmd(self, resource_name=None, mem_log=False):
         """
-        Define run command with specified options.
+        Define run command (as a list of arguments) with specified options.
         """
 
-        e = os.path.join(self.pkg.get_dir('bindir'), self.exe)
-
-        refdir = os.path.join(self.__repo, self.label)
-
         # After the stage within run_id folder in destination
         # do initialize, execute and finalize steps
-        run_cmd = e + " run --no-stage" \
-                + " --case " + refdir \
-                + " --dest " + self.__dest \
-                + " --id " + self.run_id
+        run_cmd = list(self._nostage_prefix)
 
         if mem_log:
-            run_cmd += " --mem-log"
+            run_cmd.append("--mem-log")
 
         if self.kw_args:
             if self.kw_args.find(" ") < 0:
                 self.kw_args += " "  # workaround for arg-parser issue
-            run_cmd += " --kw-args " + '"' + self.kw_args + '"'
+            run_cmd += ["--kw-args", self.kw_args]
 
         n_procs = self.__data['n_procs']
         if n_procs:
-            run_cmd += " -n " + n_procs
+            run_cmd += ["-n", str(n_procs)]
 
         if resource_name:
-            run_cmd += " --with-resource " + resource_name
+            run_cmd += ["--with-resource", resource_name]
 
         return run_cmd
 
@@ -777,12 +1142,14 @@ class Case(object):
         """
         Launch run in RESU/run_id subdirectory in an batch mode.
         """
-        run_cmd_batch = "cd " + self.run_dir + os.linesep
+        run_cmd_batch = "cd " + self._run_dir_q + os.linesep
 
-        run_cmd_batch += self.build_run_cmd(resource_name, mem_log)
+        run_cmd = self.build_run_cmd(resource_name, mem_log)
+        run_cmd_batch += " ".join(shlex.quote(a) for a in run_cmd)
 
         # append run_case.log in run_dir
-        run_cmd_batch += " >> run_case.log 2>&1" + os.linesep + os.linesep
+        run_cmd_batch += " >> " + self._run_log_q + " 2>&1" \
+                       + os.linesep + os.linesep
 
         return run_cmd_batch
 
@@ -792,16 +1159,14 @@ class Case(object):
         """
         Launch run in RESU/run_id subdirectory.
         """
-        home = os.getcwd()
-        os.chdir(self.run_dir)
-
         run_cmd = self.build_run_cmd(resource_name, mem_log)
 
         # append run_case.log in run_dir
         file_name = os.path.join(self.run_dir, "run_case.log")
         log_run = open(file_name, mode='a')
 
-        error, self.is_time = run_studymanager_command(run_cmd, log_run)
+        error, self.is_time = run_studymanager_command(run_cmd, log_run,
+                                                       cwd=self.run_dir)
 
         mem_log_leak = False
         if mem_log:
@@ -814,21 +1179,17 @@ class Case(object):
             self.compare = False
             self.plot = False
 
-        os.chdir(home)
-
         return error, mem_log_leak
 
     #---------------------------------------------------------------------------
 
     def runCompare(self, studies, r, d, threshold, args, reference=None):
-        home = os.getcwd()
-
         node = None
 
         if reference:
             result = os.path.join(reference, self.label, self.resu)
         else:
-            result = os.path.join(self.__repo, self.label, self.resu)
+            result = self._resu_repo
         # check_dir called again here to get run_id (possibly date-hour)
         repo, msg = self.check_dir(node, result, r, "repo")
         if msg:
@@ -837,22 +1198,22 @@ class Case(object):
         if not os.path.isfile(repo):
             repo += '.csc'
 
-        result = os.path.join(self.__dest, self.label, self.resu)
+        result = self._resu_dest
         # check_dir called again here to get run_id (possibly date-hour)
         dest, msg = self.check_dir(node, result, d, "dest")
         if msg:
             studies.reporting(msg)
         dest = os.path.join(result, dest, 'checkpoint', 'main.csc')
 
-        cmd = self.__diff + ' ' + repo + ' ' + dest
+        cmd = separate_args(self.__diff) + [repo, dest]
 
         self.threshold = "default"
         if threshold != None:
-            cmd += ' --threshold ' + threshold
+            cmd += ['--threshold', threshold]
             self.threshold = threshold
 
         if args != None:
-            cmd += (" " + args)
+            cmd += separate_args(args)
             l = args.split()
             try:
                 i = l.index('--threshold')
@@ -860,46 +1221,43 @@ class Case(object):
             except:
                 pass
 
-        l = subprocess.Popen(cmd,
-                             shell=True,
-                             executable=cs_exec_environment.get_shell_type(),
-                             stdout=subprocess.PIPE,
-                             universal_newlines=True).stdout
-        lines = l.readlines()
-
         # list of field differences
         tab = []
         # meshes have same sizes
         m_size_eq = True
 
-        # studymanager compare log only for field of real values
-        for i in range(len(lines)):
-            # only select line with "Type" (english and french) and ';'
-            # since this should be only true for heads of section
-            if lines[i].find("Type") != -1 and lines[i].find(";") != -1:
-                line = [x.replace("\""," ").strip() for x in lines[i].split(";")]
+        # studymanager compare log only for field of real values;
+        # output is streamed and handled as bytes, only kept values
+        # being decoded
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE) as p:
+            it = iter(p.stdout)
+            for head in it:
+                # only select line with "Type" (english and french) and ';'
+                # since this should be only true for heads of section
+                if not (b"Type" in head and b";" in head):
+                    continue
+
+                line = [x.replace(b"\"", b" ").strip() for x in head.split(b";")]
                 name = line[0]
-                info = [x.split(":") for x in line[1:]]
+                info = [x.split(b":") for x in line[1:]]
                 info = [[x[0].strip(),x[1].strip()] for x in info]
 
                 # section with at least 2 informations (location, type) after
                 # their name, and of type r (real)
-                if len(info) >= 2 and info[1][1] in ['r4', 'r8']:
+                if len(info) >= 2 and info[1][1] in (b'r4', b'r8'):
+                    next_line = next(it, b'')
                     # if next line contains size, this means sizes are different
-                    if lines[i+1].find("Taille") != -1 or lines[i+1].find("Size") != -1:
+                    if any(k in next_line for k in _diff_size_markers):
                         m_size_eq = False
                         break
                     else:
-                        line = [x.strip() for x in lines[i+1].split(";")]
-                        vals = [x.split(":") for x in line]
-                        vals = [[x[0].strip(),x[1].strip()] for x in vals]
+                        vals = [x.split(b":") for x in next_line.split(b";")]
+                        name = name.decode('utf-8', 'replace')
                         tab.append([name.replace("_", "\_"),
-                                    vals[1][1],
-                                    vals[2][1],
+                                    vals[1][1].strip().decode('utf-8', 'replace'),
+                                    vals[2][1].strip().decode('utf-8', 'replace'),
                                     self.threshold])
 
-        os.chdir(home)
-
         return tab, m_size_eq
 
     #---------------------------------------------------------------------------
@@ -959,27 +1317,34 @@ class Case(object):
 
         # 2. The result directory must be found/read automatically;
         elif rep == "":
-            # check if there is at least one result directory.
-            if len(list(filter(nodot, os.listdir(result)))) == 0:
-                msg += "there is no result directory in %s." %(result)
-                return None, msg
-
-            # if no run_id is specified in the xml file
-            # only one result directory allowed in RESU
-            if len(list(filter(nodot, os.listdir(result)))) > 1 \
-               and self.run_id == "run1":
-                msg += "there are several result directories in %s " \
-                       "and no run id specified." % (result)
-                return None, msg
-
-            rep = self.run_id
             # if no run_id is specified in the xml file
             # the only result directory present in RESU is taken
-            if rep == "run1":
-                rep = list(filter(nodot, os.listdir(result)))[0]
+            # (its type is known from the directory scan)
+            if self.run_id == "run1":
+                first, count = _resu_summary(result)
+
+                # check if there is at least one result directory.
+                if count == 0:
+                    msg += "there is no result directory in %s." %(result)
+                    return None, msg
+
+                # only one result directory allowed in RESU
+                if count > 1:
+                    msg += "there are several result directories in %s " \
+                           "and no run id specified." % (result)
+                    return None, msg
+
+                rep = first.name
+                rep_f = first.path
+                is_dir = first.is_dir()
+
+            # otherwise, the RESU folder does not need to be scanned
+            else:
+                rep = self.run_id
+                rep_f = os.path.join(result, rep)
+                is_dir = os.path.isdir(rep_f)
 
-            rep_f = os.path.join(result, rep)
-            if not os.path.isdir(rep_f):
+            if not is_dir:
                 msg += "the result directory %s does not exist." %(rep_f)
                 return None, msg
 
@@ -1017,18 +1382,47 @@ class Case(object):
             if reference:
                 result = os.path.join(reference, self.label, self.resu)
             else:
-                result = os.path.join(self.__repo, self.label, self.resu)
+                result = self._resu_repo
             rep, msg = self.check_dir(node, result, repo, "repo")
 
         if dest != None:
             # build path to RESU directory with path to study and case label in the dest
-            result = os.path.join(self.__dest, self.label, self.resu)
+            result = self._resu_dest
             rep, msg = self.check_dir(node, result, dest, "dest")
 
         return msg
 
     #---------------------------------------------------------------------------
 
+    def _existing_names(self, dir_path):
+        """
+        Return the names of files in a directory, listing it only once
+        until clear_file_names is called. On POSIX systems, names are kept
+        as bytes, so that they do not need to be decoded.
+        """
+        names = self._file_names.get(dir_path)
+        if names is None:
+            scan_path = os.fsencode(dir_path) if _bytes_names else dir_path
+            try:
+                with os.scandir(scan_path) as it:
+                    names = frozenset(e.name for e in it if e.is_file())
+            except OSError:
+                names = frozenset()
+            self._file_names[dir_path] = names
+
+        return names
+
+    #---------------------------------------------------------------------------
+
+    def clear_file_names(self):
+        """
+        Forget directory listings used by check_file (files may have been
+        created since).
+        """
+        self._file_names.clear()
+
+    #---------------------------------------------------------------------------
+
     def check_file(self, folder, dest, file_name):
         """
         Verify the existence of file in destination
@@ -1037,7 +1431,14 @@ class Case(object):
 
         # build path to directory in destination
         file_addr = os.path.join(folder, dest, file_name)
-        if not os.path.isfile(file_addr):
+        if os.path.dirname(file_name):
+            found = os.path.isfile(file_addr)
+        else:
+            dir_path = os.path.join(folder, dest)
+            if _bytes_names:
+                file_name = os.fsencode(file_name)
+            found = file_name in self._existing_names(dir_path)
+        if not found:
             msg = "    The file %s does not exist." %(file_addr)
 
         return msg
@@ -1107,10 +1508,15 @@ class Study(object):
         self.label = study
         self.index = index
 
+        # tags given at the command line, as sets of interned strings
+        if with_tags:
+            with_tags = frozenset(sys.intern(t) for t in with_tags)
+        if without_tags:
+            without_tags = frozenset(sys.intern(t) for t in without_tags)
+
         self.cases = []
         self.matplotlib_figures = []
         self.input_figures = []
-        self.case_labels = []
 
         # get list of cases in study
         on_cases = parser.getStatusOnCasesLabels(study)
@@ -1120,43 +1526,60 @@ class Study(object):
 
         else:
 
-            for data in self.__parser.getStatusOnCasesKeywords(self.label):
+            # invariant arguments of the case constructor
+            log_file = self.__log_file
+            diff = self.__diff
+            repo = self.__repo
+            dest = self.__dest
+            label = self.label
+            index = self.index
+            intern = sys.intern
+            n_procs_s = str(n_procs) if n_procs else None
+            cases_append = self.cases.append
 
-                # n_procs given in smgr command line overwrites n_procs by case
-                if n_procs:
-                    data['n_procs'] = str(n_procs)
+            for data in parser.getStatusOnCasesKeywords(label):
 
                 # TODO: move tag's filtering to the graph level
                 # not done for now as the POST step needs tags also
                 # check if every tag passed by option --with-tags belongs to
                 # list of tags of the current case
-                tagged = False
-                if with_tags and data['tags']:
-                    tagged = all(tag in data['tags'] for tag in with_tags)
-                elif not with_tags:
-                    tagged = True
+                tag_set = frozenset(intern(t) for t in (data['tags'] or ()))
+                tagged = not with_tags or with_tags.issubset(tag_set)
 
                 # check if none of tags passed by option --without-tags
                 # belong to list of tags of the current case
-                exclude = False
-                if without_tags and data['tags']:
-                    exclude = any(tag in data['tags'] for tag in without_tags)
-
-                # do not append case if tags do not match
-                if tagged and not exclude:
-                    c = Case(pkg,
-                             self.__log_file,
-                             self.__diff,
-                             self.__parser,
-                             self.label,
-                             self.index,
-                             smgr_cmd,
-                             data,
-                             self.__repo,
-                             self.__dest,
-                             resource_config=resource_config)
-                    self.cases.append(c)
-                    self.case_labels.append(c.label)
+                exclude = bool(without_tags) and not without_tags.isdisjoint(tag_set)
+
+                # do not build case if tags do not match
+                if not tagged or exclude:
+                    continue
+
+                # n_procs given in smgr command line overwrites n_procs by case
+                if n_procs_s:
+                    data['n_procs'] = n_procs_s
+
+                c = Case(pkg,
+                         log_file,
+                         diff,
+                         parser,
+                         label,
+                         index,
+                         smgr_cmd,
+                         data,
+                         repo,
+                         dest,
+                         resource_config=resource_config)
+                c.tags = tag_set
+                cases_append(c)
+
+    #---------------------------------------------------------------------------
+
+    @property
+    def case_labels(self):
+        """
+        Labels of the cases of the study.
+        """
+        return [c.label for c in self.cases]
 
     #---------------------------------------------------------------------------
 
@@ -1198,14 +1621,34 @@ class Studies(object):
         is_study = isStudy(cwd, pkg)
         studyd = None
         studyp = None
+        studyp_base = None
+        studyp_parent = None
         if is_study or options.create_xml:
             # default study directory is current one
+            # (cwd is absolute and normalized, so split it once)
             studyp = cwd
+            studyp_parent, studyp_base = os.path.split(studyp)
 
         smgr = None
+        self.__plotter = None
+        self.__plotter_built = False
         self.__log = None
         self.__log_compile = None
         self.__log_file = None
+        self.__log_lines = 0
+
+        # os.path.isdir results for repository paths (not modified by runs)
+        self._repo_isdir_cache = {}
+
+        # file system actions planned when creating studies, as
+        # (operation, path, source) keys, executed once in order
+        self._fs_plan = OrderedDict()
+
+        # directory entries scanned when building reports, by path
+        self.__dir_entries = {}
+
+        # (graph, [(study label, study object, cases), ...]) index
+        self.__cases_by_study = None
 
         # Store options
 
@@ -1234,6 +1677,8 @@ class Studies(object):
         # Convert in minutes
         self.__slurm_batch_wtime = options.slurm_batch_wtime * 60
         self.__slurm_batch_args  = options.slurm_batch_args
+        # end of slurm batch headers, by number of processes
+        self.__slurm_batch_options = {}
         self.__sheet             = options.sheet
         self.__default_fmt       = options.default_fmt
         # do not use tex in matpl(built-in mathtext is used instead)
@@ -1292,7 +1737,7 @@ class Studies(object):
         filename = options.filename
         if self.__create_xml:
             if filename is None:
-                studyd = os.path.basename(studyp)
+                studyd = studyp_base
                 filename = "smgr.xml"
                 options.filename = filename
 
@@ -1367,8 +1812,8 @@ class Studies(object):
             # if current directory is a study
             # set repository as directory containing the study
             if is_study:
-                studyd = os.path.basename(studyp)
-                self.__parser.setRepository(os.path.join(studyp,".."))
+                studyd = studyp_base
+                self.__parser.setRepository(studyp_parent)
                 self.__repo = self.__parser.getRepository()
 
                 # check consistency of the study name
@@ -1396,8 +1841,8 @@ class Studies(object):
             # if current directory is a study
             # set destination as a directory "../RUN_(study_name)
             if is_study and studyd != None:
-                self.__parser.setDestination(os.path.join(studyp,
-                                                          "../RUN_"+studyd))
+                self.__parser.setDestination(os.path.join(studyp_parent,
+                                                          "RUN_" + studyd))
                 self.__dest = self.__parser.getDestination()
             else:
                 msg = "Can not set a default destination directory:\n" \
@@ -1411,21 +1856,24 @@ class Studies(object):
 
             # create if necessary the destination directory
 
-            if not os.path.isdir(self.__dest):
-                os.makedirs(self.__dest)
+            os.makedirs(self.__dest, exist_ok=True)
 
             # copy the updated smgr file in destination for restart
 
             dest_filename = os.path.join(self.__dest, os.path.basename(filename))
+            # (keep the document linked, as it is reused by the parser below)
+            smgr['xmlfile'] = dest_filename
             try:
-                smgr['xmlfile'] = dest_filename
-                smgr.xmlSaveDocument(prettyString=False)
-            except:
-                pass
+                smgr.xmlSaveDocument(prettyString=False, saveLink=True)
+            except Exception as error:
+                self.reporting("  /!\\ WARNING: unable to save studymanager"
+                               " file in destination: " + dest_filename
+                               + "\n" + str(error), report=False)
 
             # create definitive parser for smgr file in destination
+            # (reusing the document just saved instead of reading it again)
 
-            self.__parser = Parser(dest_filename)
+            self.__parser = Parser(dest_filename, doc=smgr.doc)
             self.__parser.setDestination(self.__dest)
             self.__parser.setRepository(self.__repo)
 
@@ -1437,15 +1885,13 @@ class Studies(object):
             # create studymanager log file
 
             self.__log_name = os.path.join(self.__dest, options.log_file)
-            self.__log_file = open(self.__log_name, "w")
+            self.__log_file = open(self.__log_name, "w", buffering=65536)
+            atexit.register(_flush_log, self.__log_file)
 
-            # create plotter and post log file
+            # create post log file (plotter is built when first needed,
+            # as importing matplotlib is costly)
 
             if options.post:
-                try:
-                    self.__plotter = Plotter(self.__parser)
-                except Exception:
-                    self.__plotter = None
                 self.__log_post_name = os.path.join(self.__dest,
                                                     "smgr_post_pro.log")
                 self.__log_post_file = open(self.__log_post_name, "w")
@@ -1454,15 +1900,17 @@ class Studies(object):
 
         self.__with_tags = None
         if options.with_tags:
-            with_tags = re.split(',', options.with_tags)
+            with_tags = options.with_tags.split(',')
             self.__with_tags = [tag.strip() for tag in with_tags]
         self.__without_tags = None
         if options.without_tags:
-            without_tags = re.split(',', options.without_tags)
+            without_tags = options.without_tags.split(',')
             self.__without_tags = [tag.strip() for tag in without_tags]
 
         # build the list of the studies
 
+        clear_case_state_cache()
+
         self.labels  = self.__parser.getStudiesLabel()
         self.n_study = len(self.labels)
         self.studies = []
@@ -1484,6 +1932,9 @@ class Studies(object):
             if options.debug:
                 self.reporting(" Append study:" + l, report=False)
 
+        # run folder states may change in later stages
+        clear_case_state_cache()
+
         # Handle relative paths:
         if self.__ref:
             if not os.path.isabs(self.__ref):
@@ -1535,7 +1986,10 @@ class Studies(object):
         if report:
             if self.__log_file is not None:
                 self.__log_file.write(msg + '\n')
-                self.__log_file.flush()
+                # flush in batches; status lines and exits are flushed now
+                self.__log_lines += 1
+                if status or exit or self.__log_lines % _log_flush_period == 0:
+                    self.__log_file.flush()
 
         if exit:
             sys.exit(msg)
@@ -1561,14 +2015,37 @@ class Studies(object):
         Update setup files in all cases.
         """
 
+        # cases are independent: update them in worker processes
+        # (XML updates are CPU-bound Python code), reporting in order.
+        # Runs of a same case share their DATA folders, updated once.
+
+        data_dirs = {}
         for l, s in self.studies:
-            self.reporting('  o In repository: ' + l, report=False)
             for case in s.cases:
-                self.reporting('    - update setup file in %s' % case.label,
-                               report=False)
-                error = case.update()
-                if error:
-                   self.reporting(error, stdout=False, report=False, exit=True)
+                data_dirs[case] = tuple(case.setup_data_dirs())
+        n_workers = min(len(set(data_dirs.values())), os.cpu_count() or 1)
+
+        with ProcessPoolExecutor(max_workers=max(n_workers, 1)) as ex:
+            updates = {}
+            futures = {}
+            for case, dirs in data_dirs.items():
+                if dirs not in updates:
+                    updates[dirs] = ex.submit(update_setup_files, case.pkg,
+                                              dirs)
+                futures[case] = updates[dirs]
+
+            for l, s in self.studies:
+                self.reporting('  o In repository: ' + l, report=False)
+                for case in s.cases:
+                    self.reporting('    - update setup file in %s' % case.label,
+                                   report=False)
+                    error = futures[case].result()
+                    if error:
+                        # stop at the first error: cancel pending updates
+                        for f in updates.values():
+                            f.cancel()
+                        self.reporting(error, stdout=False, report=False,
+                                       exit=True)
 
         self.reporting('',report=False)
 
@@ -1587,8 +2064,9 @@ class Studies(object):
             self.reporting("    /!\ All earlier run folders will not be erased."
                            " Use --rm option to do so.")
 
-        study_list = []
-        case_list = []
+        study_list = set()
+        case_list = set()
+        prepare = set()
 
         for case in self.graph.graph_dict:
 
@@ -1596,32 +2074,98 @@ class Studies(object):
             study = case.study
             if study not in study_list:
                 self.create_study(study)
-                study_list.append(study)
+                study_list.add(study)
 
             # only run step requires to create cases
             if run_step:
                 # second step: clean RESU folder if necessary
                 case_name = case.study + "/" + case.label
                 if case_name not in case_list and self.__force_rm:
-                    case_list.append(case_name)
+                    case_list.add(case_name)
                     # Build short path to RESU dir. such as 'CASE1/RESU'
                     _dest_resu_dir = os.path.join(self.__dest, case.study,
                                                   case.label, case.resu)
-                    if os.path.isdir(_dest_resu_dir):
-                        if os.listdir(_dest_resu_dir):
-                            shutil.rmtree(_dest_resu_dir)
-                            os.makedirs(_dest_resu_dir)
-                            self.reporting("  All earlier results in case %s/%s "
-                                           "are removed (option --rm activated)"
-                                           %(case.label, case.resu))
+                    try:
+                        with os.scandir(_dest_resu_dir) as it:
+                            resu_not_empty = any(True for e in it)
+                    except (FileNotFoundError, NotADirectoryError):
+                        resu_not_empty = False
+                    if resu_not_empty:
+                        self.plan_fs_action("rmtree", _dest_resu_dir)
+                        self.plan_fs_action("mkdir", _dest_resu_dir)
+                        self.reporting("  All earlier results in case %s/%s "
+                                       "are removed (option --rm activated)"
+                                       %(case.label, case.resu))
+
+                prepare.add(case)
+
+        self.execute_fs_plan()
+
+        # third step: prepare run folders, cases of a given level being
+        # independent from each other
+        for batch in self.batches:
+            batch = [case for case in batch if case in prepare]
+            if not batch:
+                continue
+            with ThreadPoolExecutor(max_workers=min(32, len(batch))) as ex:
+                for log_lines in ex.map(lambda c: c.prepare_run_folder(),
+                                        batch):
+                    for line in log_lines:
+                        self.reporting(line)
 
-                # thrid step: prepare run folder
-                log_lines = case.prepare_run_folder()
+        self.reporting('')
 
-                for line in log_lines:
-                    self.reporting(line)
+    #---------------------------------------------------------------------------
 
-        self.reporting('')
+    def _repo_isdir(self, path):
+        """
+        Check if a repository path is a directory, caching the result
+        (the repository is not modified by studymanager).
+        """
+        is_dir = self._repo_isdir_cache.get(path)
+        if is_dir is None:
+            is_dir = os.path.isdir(path)
+            self._repo_isdir_cache[path] = is_dir
+
+        return is_dir
+
+    #---------------------------------------------------------------------------
+
+    def plan_fs_action(self, op, path, src=None):
+        """
+        Add a file system action to the plan, if not already planned.
+        Actions are "rmtree", "mkdir", "remove" (a file, if present) and
+        "copytree" (from src, over an existing destination).
+        """
+        self._fs_plan.setdefault((op, path, src), None)
+
+    #---------------------------------------------------------------------------
+
+    def execute_fs_plan(self):
+        """
+        Execute planned file system actions in order, and clear the plan.
+        """
+        for op, path, src in self._fs_plan:
+            if op == "rmtree":
+                try:
+                    shutil.rmtree(path)
+                except FileNotFoundError:
+                    pass
+            elif op == "mkdir":
+                os.makedirs(path, exist_ok=True)
+            elif op == "remove":
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            elif op == "copytree":
+                try:
+                    copy_tree(src, path)
+                except OSError:
+                    self.reporting("    /!\\ ERROR while copying %s folder"
+                                   % os.path.relpath(path, self.__dest))
+
+        self._fs_plan.clear()
 
     #---------------------------------------------------------------------------
 
@@ -1631,13 +2175,11 @@ class Studies(object):
         repo_study = os.path.join(self.__repo, study)
 
         new_study = False
-        home = os.getcwd()
-        os.chdir(self.__dest)
         # Create study if necessary
         if not os.path.isdir(dest_study):
             new_study = True
-            # build instance of study class
-            cr_study = cs_create.study(self.__pkg, study)    # quiet
+            # build instance of study class (in destination)
+            cr_study = cs_create.study(self.__pkg, dest_study)    # quiet
 
             create_msg = "    - Create study " + study
             self.report_action_location(create_msg)
@@ -1660,14 +2202,9 @@ class Studies(object):
                     self.reporting("    /!\ POST folder is overwritten in %s"
                                    " use option --dow to disable overwrite" %study)
                 ref = os.path.join(repo_study, "POST")
-                if os.path.isdir(ref):
+                if self._repo_isdir(ref):
                     des = os.path.join(dest_study, "POST")
-                    shutil.rmtree(des)
-                    try:
-                        shutil.copytree(ref, des)
-                    except:
-                        self.reporting("    /!\ ERROR while copying POST folder"
-                                       " in %s" %study)
+                    self.plan_fs_action("copytree", des, ref)
             else:
                 if self.__sheet and not self.__postpro:
                     self.reporting("    /!\ POST folder is not overwritten in %s"
@@ -1678,22 +2215,15 @@ class Studies(object):
             # V&V description report
             # Copy REPORT folder
             ref = os.path.join(repo_study, "REPORT")
-            if os.path.isdir(ref):
+            if self._repo_isdir(ref):
                 des = os.path.join(dest_study, "REPORT")
                 if os.path.isdir(des):
                     self.reporting("    /!\ REPORT folder is overwritten in %s"
                                    " use option --dow to disable overwrite"
                                    %study)
-                    shutil.rmtree(des)
-                try:
-                    shutil.copytree(ref, des)
-                    # if file is present, remove write-up.pdf in destination
-                    writeup = os.path.join(des, "write-up.pdf")
-                    if os.path.isfile(writeup):
-                        os.remove(writeup)
-                except:
-                    self.reporting("    /!\ ERROR while copying REPORT folder"
-                                   " in %s" %study)
+                self.plan_fs_action("copytree", des, ref)
+                # if file is present, remove write-up.pdf in destination
+                self.plan_fs_action("remove", os.path.join(des, "write-up.pdf"))
 
             else:
                 if self.__sheet:
@@ -1701,16 +2231,11 @@ class Studies(object):
                                    " folder to generate description report of"
                                    " study %s" %study)
 
-            # Copy STYLE folder
+            # Copy STYLE folder (shared by all studies, so copied once)
             ref = os.path.join(self.__repo, "STYLE")
-            if os.path.isdir(ref):
+            if self._repo_isdir(ref):
                 des = os.path.join(self.__dest, "STYLE")
-                if os.path.isdir(des):
-                    shutil.rmtree(des)
-                try:
-                    shutil.copytree(ref, des)
-                except:
-                    self.reporting("    /!\ ERROR while copying STYLE folder")
+                self.plan_fs_action("copytree", des, ref)
             else:
                 if self.__sheet:
                     self.reporting("    /!\ STYLE folder is mandatory in"
@@ -1719,28 +2244,21 @@ class Studies(object):
 
             # Copy README file(s) if it exists
             # If a README file exists, then only this file is considered
-            readme_files = [f for f in os.listdir(repo_study) if f.startswith('README')]
+            # (regular files only, using the file types cached by scandir)
+            with os.scandir(repo_study) as it:
+                readme_files = [e.name for e in it
+                                if e.name.startswith('README') and e.is_file()]
             if 'README' in readme_files:
                 # Keep only this file and ignore the other README* files
-                readme = os.path.join(repo_study, "README")
-                if os.path.isfile(readme):
-                    dest_file = os.path.join(dest_study, "README")
-                    if os.path.isfile(dest_file):
-                        self.reporting(f"    /!\ README file is overwritten in {study}"
-                                       " use option --dow to disable overwrite")
-                    shutil.copyfile(readme, dest_file)
+                readme_files = ['README']
 
-            else:
-                for f in readme_files:
-                    readme = os.path.join(repo_study, f)
-                    if os.path.isfile(readme):
-                        dest_file = os.path.join(dest_study, f)
-                        if os.path.isfile(dest_file):
-                            self.reporting(f"    /!\ {f} file is overwritten in {study}"
-                                           " use option --dow to disable overwrite")
-                        shutil.copyfile(readme, dest_file)
-
-        os.chdir(home)
+            for f in readme_files:
+                readme = os.path.join(repo_study, f)
+                dest_file = os.path.join(dest_study, f)
+                if os.path.isfile(dest_file):
+                    self.reporting(f"    /!\\ {f} file is overwritten in {study}"
+                                   " use option --dow to disable overwrite")
+                shutil.copyfile(readme, dest_file)
 
     #---------------------------------------------------------------------------
 
@@ -1758,47 +2276,59 @@ class Studies(object):
             self.reporting("     - level=" + str(filter_level))
             self.reporting("     - n_procs=" + str(filter_n_procs))
 
-        # create the global graph with all cases of all studies without filtering
-        global_graph = dependency_graph()
+        # sort all cases of all studies by level without filtering
+        cases = []
         for l, s in self.studies:
             for case in s.cases:
                 if case.compute or case.compare or case.plot or case.sheet or \
                    case.state:
-                    msg = global_graph.add_node(case)
-                    if msg:
-                        self.reporting("Warning in global graph: " + msg)
+                    cases.append(case)
 
                 if case.no_restart:
                     self.reporting(" WARNING: " + case.title + " was cancelled.")
                     self.reporting(" The restart folder seems problematic. See " + case.depends)
 
-        # extract the sub graph based on filters and tags
-        if filter_level is not None or filter_n_procs is not None:
-
-            sub_graph = dependency_graph()
-            for node in global_graph.graph_dict:
-
-                # check if the level of the case is the targeted one
-                # only effective if filter_level is prescribed
-                target_level = True
-                if filter_level is not None:
-                    target_level = node.level is int(filter_level)
-
-                # check if the number of procs of the case is the targeted one
-                # only effective if filter_n_procs is prescribed
-                target_n_procs = True
-                if filter_n_procs is not None:
-                    target_n_procs = node.n_procs is int(filter_n_procs)
-
-                if target_level and target_n_procs:
-                    msg = sub_graph.add_node(node)
-                    if msg:
-                        self.reporting("Warning in filtered graph: " + msg)
-
-            self.graph = sub_graph
-
-        else:
-            self.graph = global_graph
+        titles = set(case.title for case in cases)
+        for case in cases:
+            if case.depends and case.depends not in titles:
+                self.reporting("Warning in global graph: Dependency " \
+                               + case.depends + " was not found in the list " \
+                               + "of considered cases. " + case.title \
+                               + " will be considered without dependency in " \
+                               + "the graph. Please check that the required " \
+                               + "results exist.\n")
+
+        self.batches = build_case_dag(cases)
+
+        # levels are known for all cases: build the (possibly filtered)
+        # graph in a single pass
+        if filter_level is not None:
+            filter_level = int(filter_level)
+        if filter_n_procs is not None:
+            filter_n_procs = int(filter_n_procs)
+        filtered = filter_level is not None or filter_n_procs is not None
+        graph_name = "filtered graph" if filtered else "global graph"
+
+        # (in study and case order, as post-processing and reports handle
+        # the cases of each study together; levels are only used to
+        # schedule runs)
+        self.graph = dependency_graph()
+        for case in cases:
+
+            # check if the level of the case is the targeted one
+            # only effective if filter_level is prescribed
+            if filter_level is not None and case.level != filter_level:
+                continue
+
+            # check if the number of procs of the case is the targeted one
+            # only effective if filter_n_procs is prescribed
+            if filter_n_procs is not None \
+               and case.n_procs != filter_n_procs:
+                continue
+
+            msg = self.graph.add_node(case)
+            if msg:
+                self.reporting("Warning in " + graph_name + ": " + msg)
 
         self.reporting('')
 
@@ -1813,18 +2343,27 @@ class Studies(object):
         log_comp_name = os.path.join(self.__repo, "smgr_compilation.log")
         log_comp_file = open(log_comp_name, "w")
 
+        # runs of a same case share their sources, which are compiled once
+        compiled = {}
+
         iko = 0
         for l, s in self.studies:
             self.reporting('  o Compile study: ' + l + ' (in repository)',
                            report=False)
             for case in s.cases:
 
-                # build case dir. (in repo.)
-                study_path = os.path.join(self.__repo, case.study)
+                key = (case.study, case.label)
+                if key in compiled:
+                    is_compiled = compiled[key]
+                    case.is_compiled = is_compiled
+                else:
+                    # build case dir. (in repo.)
+                    study_path = os.path.join(self.__repo, case.study)
 
-                # test compilation
-                is_compiled = case.test_compilation(study_path,
-                                                    log_comp_file)
+                    # test compilation
+                    is_compiled = case.test_compilation(study_path,
+                                                        log_comp_file)
+                    compiled[key] = is_compiled
 
                 # report
                 if is_compiled == "OK":
@@ -1904,19 +2443,12 @@ class Studies(object):
 
         self.reporting("  o Check slurm batch configuration")
 
-        nb_cases_short = 0
-
         if self.__slurm_batch_size == 1:
 
-            # loop on level (0 means without dependency)
-            for level in range(self.graph.max_level+1):
-                # loop on number of processes
-                for nproc in range(self.graph.max_proc):
-                    # loop on cases of the sub graph
-                    for case in self.graph.extract_sub_graph(level,nproc+1).graph_dict:
-
-                        if case.expected_time < 5:
-                            nb_cases_short += 1
+            # each case of the graph is in a single (level, n_procs) batch
+            # group, so count short cases in a single pass
+            nb_cases_short = sum(1 for case in self.graph.graph_dict
+                                 if case.expected_time < 5)
 
             if nb_cases_short > 50:
                 self.__slurm_batch_size = 50
@@ -1942,256 +2474,190 @@ class Studies(object):
 #SBATCH --output=vnv_{3}
 #SBATCH --error=vnv_{3}
 #SBATCH --job-name={4}_{3}
+"""
+        # batches of a same level and number of processes are submitted
+        # as a single job array, with one task per batch
+        slurm_array_template = """#!/bin/sh
+#SBATCH --ntasks={0}
+#SBATCH --time={1}:{2}:00
+#SBATCH --output=vnv_{3}_%a
+#SBATCH --error=vnv_{3}_%a
+#SBATCH --job-name={4}_{3}
+#SBATCH --array=0-{5}
 """
         cur_batch_id = 0
         tot_job_id_list = []
 
         # create folder in destination
         slurm_file_dir = os.path.join(self.__dest, "slurm_files")
-        if not os.path.isdir(slurm_file_dir):
-          os.makedirs(slurm_file_dir)
-        os.chdir(slurm_file_dir)
+        os.makedirs(slurm_file_dir, exist_ok=True)
 
         self.reporting("  o Run all cases in slurm batch mode")
 
-        # loop on level (0 means without dependency)
-        for level in range(self.graph.max_level+1):
+        # cases by (level, number of processes), in graph order
+        buckets = self.graph.buckets
+
+        # arrays are submitted in the background as soon as they are
+        # written, while the next ones of the same level are prepared
+        with ThreadPoolExecutor(max_workers=32) as submitter:
+
+            # loop on level (0 means without dependency)
+            for level in range(self.graph.max_level+1):
 
-            # loop on number of processes
-            for nproc in range(self.graph.max_proc):
+                # arrays of the current level, as (submission, batches)
+                arrays = []
+
+                # loop on number of processes
+                for nproc in range(self.graph.max_proc):
 
-                batch_cmd = ""
-                cur_batch_size = 0
-                batch_total_time = 0
+                    # batches of the current array, as
+                    # (list of cases, total time)
+                    batches = []
+                    # dependency job id list for the current array
+                    # (as dictionary keys, for ordered and unique ids)
+                    dep_job_ids = {}
 
-                # dependency job id list for the current batch
-                dep_job_id_list = []
-                # list of cases of the current batch
-                cases_list = []
+                    # list of cases of the current batch
+                    cases_list = []
+                    batch_total_time = 0
 
-                # loop on cases of the sub graph
-                for case in self.graph.extract_sub_graph(level,nproc+1).graph_dict:
+                    # loop on cases of the sub graph
+                    for case in buckets.get((level, nproc+1), ()):
 
-                    if case.compute and case.is_compiled != "KO":
+                        if not (case.compute and case.is_compiled != "KO"):
+                            continue
 
                         if self.__n_iter is not None:
                             case.add_control_file(self.__n_iter)
 
-                        # check future submission total time and submit previous batch if not empty
-                        submit_prev = False
-                        if (cur_batch_size == 0) or (batch_total_time + \
-                           float(case.expected_time) < self.__slurm_batch_wtime):
-                            # append content of batch command with run of the case
-                            batch_cmd += case.build_run_batch(mem_log=self.__mem_log)
-                            cur_batch_size += 1
-                            batch_total_time += float(case.expected_time)
-                            cases_list.append(case)
-                            if level > 0:
-                                depend_id = self.graph.graph_dict[case].job_id
-                                if depend_id not in dep_job_id_list:
-                                    dep_job_id_list.append(depend_id)
-                        else:
-                            submit_prev = True
-
-                        # submit once batch size or wall time is reached
-                        if cur_batch_size >= self.__slurm_batch_size or submit_prev or \
-                           batch_total_time >= self.__slurm_batch_wtime:
-                            slurm_batch_name = "slurm_batch_file_" + \
-                                               str(cur_batch_id) + ".sh"
-                            slurm_batch_file = open(slurm_batch_name, mode='w')
-
-                            # fill file with template
-                            hh, mm = divmod(batch_total_time, 60)
-                            cmd = slurm_batch_template.format(nproc+1,
-                                                              math.ceil(hh),
-                                                              math.ceil(mm),
-                                                              cur_batch_id,
-                                                              job_name)
-
-                            # add exclusive option to batch template for
-                            # computation with at least 6 processes
-                            # force same processor otherwise
-                            if nproc+1 > 5:
-                                cmd += "#SBATCH --exclusive\n"
-                            else:
-                                cmd += "#SBATCH --nodes=1\n"
-                                cmd += "#SBATCH --ntasks-per-core=1\n"
-
-                            # add user defined options if needed
-                            if self.__slurm_batch_args:
-                                for _p in self.__slurm_batch_args:
-                                    cmd += "#SBATCH " + _p + "\n"
-
-                            cmd += "\n"
-                            slurm_batch_file.write(cmd)
-
-                            # fill file with batch command for several cases
-                            slurm_batch_file.write(batch_cmd)
-                            slurm_batch_file.flush()
-
-                            # submit batch
-                            if level < 1:
-                                output = subprocess.check_output(['sbatch',
-                                         slurm_batch_name])
-                            else:
-                                # list of dependency id should be in the
-                                # :id1:id2:id3 format
-                                list_id = ""
-                                for item in dep_job_id_list:
-                                    list_id += ":" + str(item)
-                                if len(list_id) > 0:
-                                    output = subprocess.check_output(['sbatch',
-                                             "--dependency=afterany"
-                                             + list_id, slurm_batch_name])
-                                else:
-                                    # empty list can occur with existing runs in study
-                                    output = subprocess.check_output(['sbatch',
-                                             slurm_batch_name])
-
-                            # find job id with regex and store it
-                            msg = output.decode('utf-8').strip()
-                            match = re.search('\d{8}', msg)
-                            job_id = match.group()
-                            tot_job_id_list.append(job_id)
-                            self.reporting('    - %s ...' % msg)
-                            for item in cases_list:
-                                item.job_id = job_id
-
-                            batch_cmd = ""
-                            cur_batch_id += 1
-                            cur_batch_size = 0
-                            batch_total_time = 0
-                            dep_job_id_list = []
+                        # close current batch once batch size is reached,
+                        # or if wall time would be reached with the case
+                        if cases_list and \
+                           (len(cases_list) >= self.__slurm_batch_size or \
+                            batch_total_time + case.expected_time \
+                            >= self.__slurm_batch_wtime):
+                            batches.append((cases_list, batch_total_time))
                             cases_list = []
-                            slurm_batch_file.close()
+                            batch_total_time = 0
 
-                        # complete batch info as previous one was submitted
-                        if submit_prev:
-                            # append content of batch command with run of the case
-                            batch_cmd += case.build_run_batch(mem_log=self.__mem_log)
-                            cur_batch_size += 1
-                            batch_total_time += float(case.expected_time)
-                            cases_list.append(case)
-                            if level > 0:
-                                depend_id = self.graph.graph_dict[case].job_id
-                                if depend_id not in dep_job_id_list:
-                                    dep_job_id_list.append(depend_id)
-
-                if cur_batch_size > 0:
-                    slurm_batch_name = "slurm_batch_file_" + \
-                                       str(cur_batch_id) + ".sh"
-                    slurm_batch_file = open(slurm_batch_name, mode='w')
-
-                    # fill file with template
-                    hh, mm = divmod(batch_total_time, 60)
-                    cmd = slurm_batch_template.format(nproc+1,
+                        cases_list.append(case)
+                        batch_total_time += case.expected_time
+                        if level > 0:
+                            depend_id = self.graph.graph_dict[case].job_id
+                            dep_job_ids[depend_id] = None
+
+                    if cases_list:
+                        batches.append((cases_list, batch_total_time))
+
+                    if not batches:
+                        continue
+
+                    slurm_batch_name = os.path.join(slurm_file_dir,
+                                                    "slurm_batch_file_"
+                                                    + str(cur_batch_id) + ".sh")
+
+                    # fill file with template, using the longest batch time
+                    hh, mm = divmod(max(b[1] for b in batches), 60)
+                    cmd = slurm_array_template.format(nproc+1,
                                                       math.ceil(hh),
                                                       math.ceil(mm),
                                                       cur_batch_id,
-                                                      job_name)
-
-                    # add exclusive option to batch template for
-                    # computation with at least 6 processes
-                    if nproc+1 > 5:
-                        cmd += "#SBATCH --exclusive\n"
+                                                      job_name,
+                                                      len(batches) - 1)
+
+                    # fill file with batch commands for several cases,
+                    # selected by array task id
+                    batch_cmd = 'case "$SLURM_ARRAY_TASK_ID" in\n'
+                    for i, b in enumerate(batches):
+                        batch_cmd += "%d)\n" % i
+                        for case in b[0]:
+                            batch_cmd += case.build_run_batch(mem_log=self.__mem_log)
+                        batch_cmd += ";;\n"
+                    batch_cmd += "esac\n"
 
-                    # add user defined options if needed
-                    if self.__slurm_batch_args:
-                        for _p in self.__slurm_batch_args:
-                            cmd += "#SBATCH " + _p + "\n"
+                    self.__write_slurm_batch(slurm_batch_name, cmd, batch_cmd,
+                                             n_procs=nproc+1)
 
-                    cmd += "\n"
-                    slurm_batch_file.write(cmd)
+                    # arrays of a same level do not depend on each other
+                    submission = submitter.submit(submit_slurm_batch,
+                                                  slurm_batch_name,
+                                                  list(dep_job_ids),
+                                                  slurm_file_dir)
+                    arrays.append((submission, batches))
 
-                    # fill file with batch command for several cases
-                    slurm_batch_file.write(batch_cmd)
-                    slurm_batch_file.flush()
+                    cur_batch_id += 1
 
-                    # submit batch
-                    if level < 1:
-                        output = subprocess.check_output(['sbatch',
-                                                          slurm_batch_name])
-                    else:
-                        # list of dependency id should be in the
-                        # :id1:id2:id3 format
-                        list_id = ""
-                        for item in dep_job_id_list:
-                            list_id += ":" + str(item)
-                        if len(list_id) > 0:
-                            output = subprocess.check_output(['sbatch',
-                                     "--dependency=afterany"
-                                     + list_id, slurm_batch_name])
-                        else:
-                            # empty list can occur with existing runs in study
-                            output = subprocess.check_output(['sbatch',
-                                     slurm_batch_name])
-
-                    # find job id with regex and store it
-                    msg = output.decode('utf-8').strip()
-                    match = re.search('\d{8}', msg)
-                    job_id = match.group()
+                # wait for job ids of the level, on which next levels depend
+                for submission, batches in arrays:
+                    job_id = submission.result()
                     tot_job_id_list.append(job_id)
-                    self.reporting('    - %s ...' % msg)
-                    for elem in cases_list:
-                        elem.job_id = job_id
+                    self.reporting('    - Submitted batch job %s (%d batches) ...'
+                                   % (job_id, len(batches)))
+                    for b in batches:
+                        for item in b[0]:
+                            item.job_id = job_id
+
+            # final submission for postprocessing, comparaison and state analysis
+            slurm_batch_name = os.path.join(slurm_file_dir, "slurm_batch_file_"
+                                            + str(cur_batch_id) + ".sh")
+
+            # fill file with template
+            # we consider 10 minutes per study
+            hh, mm = divmod(self.n_study*10, 60)
+            cmd = slurm_batch_template.format(1,
+                                              math.ceil(hh),
+                                              math.ceil(mm),
+                                              cur_batch_id,
+                                              job_name)
+
+            # fill file with batch command for state analysis
+            batch_cmd = self.build_final_batch(self.__postpro,
+                                               self.__compare,
+                                               self.__sheet,
+                                               state_file_name)
+
+            self.__write_slurm_batch(slurm_batch_name, cmd, batch_cmd)
+
+            job_id = submit_slurm_batch(slurm_batch_name, tot_job_id_list,
+                                        slurm_file_dir)
+            self.reporting('    - Submitted batch job %s ...' % job_id)
 
-                    batch_cmd = ""
-                    cur_batch_id += 1
-                    cur_batch_size = 0
-                    batch_total_time = 0
-                    dep_job_id_list = []
-                    cases_list = []
-                    slurm_batch_file.close()
-
-        # final submission for postprocessing, comparaison and state analysis
-        slurm_batch_name = "slurm_batch_file_" + str(cur_batch_id) + ".sh"
-        slurm_batch_file = open(slurm_batch_name, mode='w')
-
-        # fill file with template
-        # we consider 10 minutes per study
-        hh, mm = divmod(self.n_study*10, 60)
-        cmd = slurm_batch_template.format(1,
-                                          math.ceil(hh),
-                                          math.ceil(mm),
-                                          cur_batch_id,
-                                          job_name)
-
-        # add user defined options if needed
-        if self.__slurm_batch_args:
-            for _p in self.__slurm_batch_args:
-                cmd += "#SBATCH " + _p + "\n"
-
-        cmd += "\n"
-        slurm_batch_file.write(cmd)
-
-        # fill file with batch command for state analysis
-        batch_cmd += self.build_final_batch(self.__postpro,
-                                            self.__compare,
-                                            self.__sheet,
-                                            state_file_name)
-        slurm_batch_file.write(batch_cmd)
-        slurm_batch_file.flush()
-
-        # list of dependency id should be in the
-        # :id1:id2:id3 format
-        list_id = ""
-        for item in tot_job_id_list:
-            list_id += ":" + str(item)
-        if len(list_id) > 0:
-            output = subprocess.check_output(['sbatch',"--dependency=afterany"
-                   + list_id, slurm_batch_name])
-        else:
-            # empty list can occur with existing runs in study
-            output = subprocess.check_output(['sbatch', slurm_batch_name])
+        self.reporting('')
+
+    #---------------------------------------------------------------------------
+
+    def __write_slurm_batch(self, slurm_batch_name, header, batch_cmd,
+                            n_procs=None):
+        """
+        Write a slurm batch file, completing its header with placement
+        options when n_procs is given, and with user defined options.
+        """
+        # options only depend on the number of processes, so are built
+        # once for all batches using that number
+        options = self.__slurm_batch_options.get(n_procs)
+        if options is None:
+            options = ""
 
-        msg = output.decode('utf-8').strip()
-        self.reporting('    - %s ...' % msg)
+            # add exclusive option to batch template for
+            # computation with at least 6 processes
+            # force same processor otherwise
+            if n_procs is not None:
+                if n_procs > 5:
+                    options += "#SBATCH --exclusive\n"
+                else:
+                    options += "#SBATCH --nodes=1\n"
+                    options += "#SBATCH --ntasks-per-core=1\n"
 
-        slurm_batch_file.close()
+            # add user defined options if needed
+            if self.__slurm_batch_args:
+                for _p in self.__slurm_batch_args:
+                    options += "#SBATCH " + _p + "\n"
 
-        os.chdir(self.__dest)
+            options += "\n"
+            self.__slurm_batch_options[n_procs] = options
 
-        self.reporting('')
+        with open(slurm_batch_name, mode='w') as slurm_batch_file:
+            slurm_batch_file.write(header + options + batch_cmd)
 
     #---------------------------------------------------------------------------
 
@@ -2200,8 +2666,6 @@ class Studies(object):
         Launch state option in DESTINATION
         """
 
-        final_cmd = "cd " + self.__dest + os.linesep
-
         e = os.path.join(self.__pkg.get_dir('bindir'), self.__exe)
 
         # To handle possible back-end issues for reports generation
@@ -2209,31 +2673,32 @@ class Studies(object):
         # back-end executable for postprocessing, which may be different from
         # the main executable (such as one in a container with required
         # prerequisites)
-        config = configparser.ConfigParser()
-        config.read(self.__pkg.get_configfiles())
-        if config.has_option('studymanager', 'postprocessing_exec'):
-            e = config.get('studymanager', 'postprocessing_exec')
+        postprocessing_exec = get_postprocessing_exec(self.__pkg)
+        if postprocessing_exec:
+            e = postprocessing_exec
 
         # final analysis after all run_cases are finished
-        final_cmd += e + " smgr --state" \
-                       + " -f " + self.__filename \
-                       + " --repo " + self.__repo \
-                       + " --dest " + self.__dest \
-                       + " --state-file " + state_file_name
+        args = [e, "smgr", "--state",
+                "-f", self.__filename,
+                "--repo", self.__repo,
+                "--dest", self.__dest,
+                "--state-file", state_file_name]
         if postpro:
-            final_cmd += " --post"
+            args.append("--post")
         if compare:
-            final_cmd += " --compare"
+            args.append("--compare")
         if report:
-            final_cmd += " --report"
+            args.append("--report")
 
         # add tags options
         if self.__with_tags:
             tags = ','.join(str(n) for n in self.__with_tags)
-            final_cmd += " --with-tags " + '"' + tags + '"'
+            args += ["--with-tags", f'"{tags}"']
         if self.__without_tags:
             tags = ','.join(str(n) for n in self.__without_tags)
-            final_cmd += " --without-tags " + '"' + tags + '"'
+            args += ["--without-tags", f'"{tags}"']
+
+        final_cmd = f"cd {self.__dest}{os.linesep}" + " ".join(args)
 
         return final_cmd
 
@@ -2255,37 +2720,18 @@ class Studies(object):
 
         add_header_and_footer = True
 
-        colors = {case_state.UNKNOWN: "rgb(227,218,201)",
-                  case_state.STAGING: "rgb(255,191,0)",
-                  case_state.STAGED: "rgb(176,196,222)",
-                  case_state.PREPROCESSED: "rgb(216,191,216)",
-                  case_state.COMPUTED: "rgb(120,213,124)",
-                  case_state.FINALIZING: "rgb(127,255,0)",
-                  case_state.FINALIZED: "rgb(120,213,124)",
-                  case_state.RUNNING: "rgb(65,105,225)",
-                  case_state.EXCEEDED_TIME_LIMIT: "rgb(0,255,255)",
-                  case_state.FAILED: "rgb(250,128,114)"}
-
-        messages = {case_state.UNKNOWN: "Unknown",
-                    case_state.STAGING: "Staging",
-                    case_state.STAGED: "Staged",
-                    case_state.PREPROCESSED: "Preprocesses",
-                    case_state.COMPUTED: "OK",
-                    case_state.FINALIZING: "Finalizing",
-                    case_state.FINALIZED: "OK",
-                    case_state.RUNNING: "Running",
-                    case_state.EXCEEDED_TIME_LIMIT: "Time limit",
-                    case_state.FAILED: "FAILED"}
-
-        fd = open(state_file_name, 'w')
+        # copied before being modified (when memory leaks are found)
+        colors = _state_colors
+        messages = _state_messages
+
+        # parts of the file, written at once
+        parts = []
 
         if add_header_and_footer:
-            fd.write("<html>\n")
-            fd.write("<head></head>\n")
-            fd.write("<body>\n")
+            parts.append("<html>\n<head></head>\n<body>\n")
 
-        fd.write("<br><i><u>Destination folder:</u></i> "+ self.__dest + "</br> </br>")
-        fd.write("Case states:\n\n")
+        parts.append("<br><i><u>Destination folder:</u></i> "+ self.__dest + "</br> </br>")
+        parts.append("Case states:\n\n")
         t = "<table width=100% cellspacing=\"2\">\n"
         t += "<tr class=\"top\">"
 
@@ -2301,11 +2747,12 @@ class Studies(object):
         t += "<td width=6% align=\"right\">N threads</td>"
         t += "</tr>\n"
 
-        fd.write(t)
+        parts.append(t)
 
-        for case in self.graph.graph_dict:
+        cases = list(self.graph.graph_dict)
+        states = get_case_states(cases, run_timeout=run_timeout)
 
-            state, info = case.get_state(run_timeout=run_timeout)
+        for case, (state, info) in zip(cases, states):
 
             for k in info.keys():
                 if info[k] is None:
@@ -2320,68 +2767,57 @@ class Studies(object):
             if not m:
                 m = messages[state]
 
+            # info values are numbers, or empty if unknown
             mem_max = -1
             mem_s = ''
-            try:
-                for k in ('compute_mem', 'preproces_mem'):
-                    sk = info[k]
-                    if sk:
-                        mem_max = max(float(sk)/1024., mem_max)
-                        mem_s = str(round(mem_max))
-            except Exception:
-                pass
-
-            n_leaks = None
-            try:
-                n_leaks = int(info['memory_leaks'])
-                if n_leaks > 0:
-                    colors[case_state.COMPUTED] = "rgb(0,106,62)"
-                    colors[case_state.FINALIZING] = "rgb(4,128,0)"
-                    colors[case_state.FINALIZED] = "rgb(0,106,62)"
-                    m += " (memory leaks)"
-
-            except Exception:
-                pass
-
-            prepro_time = ""
-            try:
-                prepro_time = '{:g}'.format(float(info['preprocess_time']))
-            except Exception:
-                pass
+            for k in ('compute_mem', 'preprocess_mem'):
+                sk = info.get(k)
+                if sk:
+                    mem_max = max(float(sk)/1024., mem_max)
+                    mem_s = str(round(mem_max))
+
+            n_leaks = info.get('memory_leaks')
+            if n_leaks and int(n_leaks) > 0:
+                if colors is _state_colors:
+                    colors = dict(_state_colors)
+                colors[case_state.COMPUTED] = "rgb(0,106,62)"
+                colors[case_state.FINALIZING] = "rgb(4,128,0)"
+                colors[case_state.FINALIZED] = "rgb(0,106,62)"
+                m += " (memory leaks)"
+
+            prepro_time = info.get('preprocess_time')
+            if prepro_time:
+                prepro_time = '{:g}'.format(float(prepro_time))
+            else:
+                prepro_time = ""
 
-            t = ""
             if s != s_prev:
-                t += "<tr class=\"top\"><td>" + s + "</td>"
-                t += "<td>" + c + "</td>"
+                parts.append(f"<tr class=\"top\"><td>{s}</td><td>{c}</td>")
+            elif c != c_prev:
+                parts.append(f"<tr><td> </td>\n<td>{c}</td>")
             else:
-                t += "<tr><td> </td>\n"
-                if c != c_prev:
-                    t += "<td>" + c + "</td>"
-                else:
-                    t += "<td> </td>\n"
-
-            t += "<td>" + case.run_id + "</td>"
-            t += "<td style=\"background-color:" + colors[state] + "\">" + m + "</td>"
-            t += "<td align=\"right\">" + str(info['compute_time']) + "</td>"
-            t += "<td align=\"right\">" + str(info['compute_time_usage']) + "</td>"
-            t += "<td align=\"right\">" + prepro_time + "</td>"
-            t += "<td align=\"right\">" + mem_s + "</td>"
-            t += "<td align=\"right\">" + str(info['mpi_ranks']) + "</td>"
-            t += "<td align=\"right\">" + str(info['omp_threads']) + "</td>"
-            t += "</tr>\n"
-            fd.write(t)
+                parts.append("<tr><td> </td>\n<td> </td>\n")
+
+            parts.append(f"<td>{case.run_id}</td>"
+                         f"<td style=\"background-color:{colors[state]}\">{m}</td>"
+                         f"<td align=\"right\">{info['compute_time']}</td>"
+                         f"<td align=\"right\">{info['compute_time_usage']}</td>"
+                         f"<td align=\"right\">{prepro_time}</td>"
+                         f"<td align=\"right\">{mem_s}</td>"
+                         f"<td align=\"right\">{info['mpi_ranks']}</td>"
+                         f"<td align=\"right\">{info['omp_threads']}</td>"
+                         "</tr>\n")
 
             s_prev = s
             c_prev = c
 
-        t = "</table>\n</br>\n"
-        fd.write(t)
+        parts.append("</table>\n</br>\n")
 
         if add_header_and_footer:
-            fd.write("</body>\n")
-            fd.write("</html>\n")
+            parts.append("</body>\n</html>\n")
 
-        fd.close()
+        with open(state_file_name, 'w') as fd:
+            fd.writelines(parts)
 
         self.reporting('')
 
@@ -2498,6 +2934,8 @@ class Studies(object):
         self.reporting(check_msg)
         scripts_checked = False
         for case in self.graph.graph_dict:
+            case.clear_file_names()
+
             # search for scripts to check
             status, label, nodes, args, repo, dest = \
                     self.__parser.getScript(case.node)
@@ -2568,43 +3006,41 @@ class Studies(object):
         Related to keyword postpro in smgr xml file
         """
 
-        previous_study_name = None
-        for case in self.graph.graph_dict:
+        for study_label, study_object, cases in self.cases_by_study():
 
-            # detect new study
-            if case.study is not previous_study_name:
-                previous_study_name = case.study
+            script, label, nodes, args = self.__parser.getPostPro(study_label)
 
-                script, label, nodes, args = self.__parser.getPostPro(case.study)
+            # case labels and run folders of the study, if needed
+            run_dirs = None
 
-                for i in range(len(label)):
-                    if i == 0:
-                        self.reporting('  o Postprocessing results of study: ' + case.study)
-                    if script[i]:
-                        cmd = os.path.join(self.__dest, case.study, "POST", label[i])
-                        if os.path.isfile(cmd):
-                            sc_name = os.path.basename(cmd)
-                            # ensure script is executable
-                            set_executable(cmd)
+            for i in range(len(label)):
+                if i == 0:
+                    self.reporting('  o Postprocessing results of study: ' + study_label)
+                if script[i]:
+                    cmd = os.path.join(self.__dest, study_label, "POST", label[i])
+                    if os.path.isfile(cmd):
+                        sc_name = os.path.basename(cmd)
+                        # ensure script is executable
+                        set_executable(cmd)
 
-                            # retrieve study_object from index
-                            study_label, study_object = self.studies[case.study_index]
+                        if run_dirs is None:
+                            run_dirs = study_object.getRunDirectories()
 
-                            list_cases, list_dir = study_object.getRunDirectories()
-                            cmd += ' ' + args[i] + ' -c "' + list_cases + '" -d "' \
-                                   + list_dir + '" -s ' + case.study
+                        list_cases, list_dir = run_dirs
+                        cmd += ' ' + args[i] + ' -c "' + list_cases + '" -d "' \
+                               + list_dir + '" -s ' + study_label
 
-                            self.reporting('    - running postpro %s' % sc_name,
-                                           stdout=True, report=False, status=True)
+                        self.reporting('    - running postpro %s' % sc_name,
+                                       stdout=True, report=False, status=True)
 
-                            retcode, t = run_studymanager_command(cmd, self.__log_post_file)
-                            stat = "FAILED" if retcode != 0 else "OK"
+                        retcode, t = run_studymanager_command(cmd, self.__log_post_file)
+                        stat = "FAILED" if retcode != 0 else "OK"
 
-                            self.reporting('    - postpro %s --> %s (%s s)' \
-                                           % (stat, sc_name, t))
+                        self.reporting('    - postpro %s --> %s (%s s)' \
+                                       % (stat, sc_name, t))
 
-                        else:
-                            self.reporting('    - postpro %s not found' % cmd)
+                    else:
+                        self.reporting('    - postpro %s not found' % cmd)
 
         # erase empty log file
         self.__log_post_file.close()
@@ -2668,13 +3104,17 @@ class Studies(object):
     def check_input(self, case):
         """
         Check coherency between xml file of parameters and destination
-        for input markups of a run.
+        for input markups of a run (all missing files are reported).
         """
+        found = True
         for node in self.__parser.getChildren(case.node, "input"):
             file_name, dest, repo, tex = self.__parser.getInput(node)
             msg = case.check_file(case.run_dir, dest, file_name)
             if msg:
                 self.reporting(msg)
+                found = False
+
+        return found
 
     #---------------------------------------------------------------------------
 
@@ -2685,70 +3125,146 @@ class Studies(object):
         """
         check_msg = "  o Check plots and input of cases"
         self.reporting(check_msg)
-        for case in self.graph.graph_dict:
-            if case.plot:
-                # verify input, data and probes
-                self.check_input(case)
-                found_data = self.check_data(case)
-                found_probes = self.check_probes(case)
-                # stop if data or probes are missing
-                if not found_data or not found_probes:
-                    case.plot = False
-                    msg = "    - Case %s --> POST DISABLED" %(case.title)
-                    self.reporting(msg)
+        plot_cases = [case for case in self.graph.graph_dict if case.plot]
+        for case in plot_cases:
+            case.clear_file_names()
+
+            # verify input, data and probes
+            found_input = self.check_input(case)
+            found_data = self.check_data(case)
+            found_probes = self.check_probes(case)
+            # stop if input, data or probes are missing
+            if not found_input or not found_data or not found_probes:
+                case.plot = False
+                msg = "    - Case %s --> POST DISABLED" %(case.title)
+                self.reporting(msg)
 
         self.reporting('')
 
     #---------------------------------------------------------------------------
 
+    def cases_by_study(self):
+        """
+        Return the cases of the graph grouped by study, as a list of
+        (study label, study object, list of cases) tuples, with a single
+        group per study, following the order of the graph. The grouping
+        is done once per graph.
+        """
+        if self.__cases_by_study is None \
+           or self.__cases_by_study[0] is not self.graph:
+            cases_by_index = {}
+            for case in self.graph.graph_dict:
+                cases_by_index.setdefault(case.study_index, []).append(case)
+            groups = []
+            for index, cases in cases_by_index.items():
+                study_label, study_object = self.studies[index]
+                groups.append((study_label, study_object, cases))
+            self.__cases_by_study = (self.graph, groups)
+
+        return self.__cases_by_study[1]
+
+    #---------------------------------------------------------------------------
+
+    def __getPlotter(self):
+        """
+        Return the plotter, building it on first call (None if
+        plotting is not available).
+        """
+        if not self.__plotter_built:
+            self.__plotter_built = True
+            try:
+                from code_saturne.studymanager.cs_studymanager_drawing import Plotter
+                self.__plotter = Plotter(self.__parser)
+            except Exception:
+                print("Warning: import studymanager Plotter failed. Plotting disabled.\n")
+                self.__plotter = None
+
+        return self.__plotter
+
+    #---------------------------------------------------------------------------
+
     def plot(self):
         """
         Plot data.
         """
+        plotter = self.__getPlotter()
+        if plotter is None:
+            self.reporting('  o Plotting disabled (Plotter not available)')
+            self.reporting('')
+            return
 
-        previous_study_name = None
-        previous_study_object = None
-        list_cases = []
-        for case in self.graph.graph_dict:
+        # one task per study
+        global _plot_tasks
+        _plot_tasks = [(plotter, self.__dest, study_object, list_cases,
+                        self.__dis_tex, self.__default_fmt)
+                       for study_label, study_object, list_cases
+                       in self.cases_by_study()]
 
-            # detect new study
-            if case.study is not previous_study_name:
-
-                # submit previous study
-                if previous_study_name and list_cases:
-                    self.reporting('  o Plot study: ' + previous_study_name)
-                    error = self.__plotter.plot_study(self.__dest,
-                                                      previous_study_object,
-                                                      list_cases,
-                                                      self.__dis_tex,
-                                                      self.__default_fmt)
+        try:
+            # studies are plotted in forked processes when there are several
+            # of them, figure names being sent back to the study objects
+            mp_context = None
+            if len(_plot_tasks) > 1:
+                try:
+                    mp_context = multiprocessing.get_context('fork')
+                except ValueError:
+                    mp_context = None
+
+            if mp_context is not None:
+                for task in _plot_tasks:
+                    self.reporting('  o Plot study: ' + task[2].label)
+                n_workers = min(len(_plot_tasks), os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=n_workers,
+                                         mp_context=mp_context) as ex:
+                    results = list(ex.map(_plot_study_task,
+                                          range(len(_plot_tasks))))
+                for task, (error, figures) in zip(_plot_tasks, results):
+                    task[2].matplotlib_figures.extend(figures)
+                    if error:
+                        self.reporting(error)
+            else:
+                for task in _plot_tasks:
+                    self.reporting('  o Plot study: ' + task[2].label)
+                    error = plotter.plot_study(*task[1:])
                     if error:
                         self.reporting(error)
-                    list_cases = []
-
-                # store actual study name and object
-                study_label, study_object = self.studies[case.study_index]
-                previous_study_name = study_label
-                previous_study_object = study_object
-
-            # add case in list
-            list_cases.append(case)
-
-        # final study
-        if previous_study_name and list_cases:
-            self.reporting('  o Plot study: ' + previous_study_name)
-            error = self.__plotter.plot_study(self.__dest,
-                                              previous_study_object,
-                                              list_cases,
-                                              self.__dis_tex,
-                                              self.__default_fmt)
-            if error:
-                self.reporting(error)
+
+        finally:
+            _plot_tasks = []
 
         self.reporting('')
 
     #---------------------------------------------------------------------------
 
+    def __list_dir(self, path):
+        """
+        Return the entries of a directory as a dictionary indexed by name,
+        scanning it only once per report (empty if it is not a directory).
+        """
+        entries = self.__dir_entries.get(path)
+        if entries is None:
+            try:
+                with os.scandir(path) as it:
+                    entries = {e.name: e for e in it}
+            except OSError:
+                entries = {}
+            self.__dir_entries[path] = entries
+
+        return entries
+
+    #---------------------------------------------------------------------------
+
+    def __is_file(self, path):
+        """
+        Check if a file exists, using the scanned entries of its directory.
+        """
+        d, name = os.path.split(path)
+        e = self.__list_dir(d).get(name)
+
+        return e is not None and e.is_file()
+
+    #---------------------------------------------------------------------------
+
     def report_input(self, doc, i_nodes, s_label, c_label=None, r_label="RESU",
                      run_label=None):
         """
@@ -2775,17 +3291,16 @@ class Studies(object):
 
             if d == '':
                 ff = os.path.join(fd, f)
-                if not os.path.isfile(ff):
-                    if os.path.isdir(fd):
-                        l = os.listdir(fd)
-                        if len(l) == 1:
-                            ff = os.path.join(fd, l[0], f)
+                if not self.__is_file(ff):
+                    l = self.__list_dir(fd)
+                    if len(l) == 1:
+                        ff = os.path.join(fd, next(iter(l)), f)
             else:
                 ff = os.path.join(fd, d, f)
 
-            if not os.path.isfile(ff):
+            if not self.__is_file(ff):
                 self.reporting("    Warning: this file does not exist: %s" %ff)
-            elif ff[-4:] in ('.png', '.jpg', '.pdf') or ff[-5:] == '.jpeg':
+            elif ff.endswith(_figure_extensions):
                 doc.addFigure(ff)
             elif tex == 'on':
                 doc.addTexInput(ff)
@@ -2799,9 +3314,6 @@ class Studies(object):
         Copy input in POST for later description report generation
         """
 
-        # list of accepted formats
-        input_format = ['.png', '.jpg', '.pdf', '.tex', '.jpeg']
-
         for i_node in i_nodes:
             file_name, tmp, repo, tex = self.__parser.getInput(i_node)
             input_file = os.path.join(self.__dest, s_label, c_label, r_label,
@@ -2813,14 +3325,13 @@ class Studies(object):
                                      c_label, run_label, file_name)
             dest_folder = os.path.dirname(file_dest)
 
-            if os.path.isfile(input_file):
-                file_format = input_file[-4:]
-                if input_file[-5] == ".":
-                    file_format = input_file[-5:]
-                if file_format in input_format:
-                    if not os.path.exists(dest_folder):
-                        os.makedirs(dest_folder)
-                    shutil.copyfile(input_file, file_dest)
+            if input_file.endswith(_input_extensions) \
+               and self.__is_file(input_file):
+                os.makedirs(dest_folder, exist_ok=True)
+                _copy_file_contents(input_file, file_dest)
+                # POST listing may be outdated (CURRENT folder)
+                self.__dir_entries.pop(os.path.join(self.__dest, s_label,
+                                                    'POST'), None)
 
     #---------------------------------------------------------------------------
 
@@ -2835,53 +3346,51 @@ class Studies(object):
 
         self.reporting('  o Generation of the automatic detailed report')
 
+        # results may have changed since a previous report
+        self.__dir_entries.clear()
+
         # figures report
         doc = Report(self.__dest,
                      report_fig,
                      self.__pdflatex)
 
-        previous_study_name = None
-        for case in self.graph.graph_dict:
+        for study_label, study_object, cases in self.cases_by_study():
+            doc.appendLine("\\section{%s}" % study_label)
+
+            # handle figures and inputs
+            if study_object.matplotlib_figures or study_object.input_figures:
+                doc.appendLine("\\subsection{Graphical results}")
+                for g in study_object.matplotlib_figures:
+                    doc.addFigure(g)
+                for g in study_object.input_figures:
+                    doc.addFigure(g)
 
-            # detect new study
-            if case.study is not previous_study_name:
-                # retrieve study_object from index
-                study_label, study_object = self.studies[case.study_index]
-                previous_study_name = study_label
-                doc.appendLine("\\section{%s}" % case.study)
-
-                # handle figures and inputs
-                if study_object.matplotlib_figures or study_object.input_figures:
-                    doc.appendLine("\\subsection{Graphical results}")
-                    for g in study_object.matplotlib_figures:
-                        doc.addFigure(g)
-                    for g in study_object.input_figures:
-                        doc.addFigure(g)
-
-                # handle the input nodes that are inside postpro nodes
-                script, label, nodes, args = self.__parser.getPostPro(case.study)
-
-                needs_pp_input = False
+            # handle the input nodes that are inside postpro nodes
+            script, label, nodes, args = self.__parser.getPostPro(study_label)
+
+            needs_pp_input = False
+            for i in range(len(label)):
+                if script[i]:
+                    input_nodes = \
+                        self.__parser.getChildren(nodes[i], "input")
+                    if input_nodes:
+                        needs_pp_input = True
+                        break
+
+            if needs_pp_input:
+                doc.appendLine("\\subsection{Results for "
+                               "post-processing cases}")
                 for i in range(len(label)):
                     if script[i]:
                         input_nodes = \
                             self.__parser.getChildren(nodes[i], "input")
                         if input_nodes:
-                            needs_pp_input = True
-                            break
-
-                if needs_pp_input:
-                    doc.appendLine("\\subsection{Results for "
-                               "post-processing cases}")
-                    for i in range(len(label)):
-                        if script[i]:
-                            input_nodes = \
-                                self.__parser.getChildren(nodes[i], "input")
-                            if input_nodes:
-                                self.report_input(doc, input_nodes, case.study)
+                            self.report_input(doc, input_nodes, study_label)
 
             # handle input nodes that are inside case nodes
-            if case.plot:
+            for case in cases:
+                if not case.plot:
+                    continue
                 nodes = self.__parser.getChildren(case.node, "input")
                 if nodes:
                     doc.appendLine("\\subsection{Results for "
@@ -2905,52 +3414,191 @@ class Studies(object):
         REPORT ans STYLE folders are mandatory
         """
 
-        # save current location
-        save_dir = os.getcwd()
-
         self.reporting('  o Generation of V&V description report')
 
-        previous_study_name = None
-        for case in self.graph.graph_dict:
-
-            # detect new study
-            if case.study is not previous_study_name:
-                previous_study_name = case.study
+        # metadata of the parameters file, read once for all studies
+        md = None
 
-                # change directory to make report pdf file
-                make_dir = os.path.join(self.__dest, case.study, "REPORT")
-                if os.path.isdir(make_dir):
-                    os.chdir(make_dir)
+        # REPORT folder of each study (None if missing), in graph order
+        make_dirs = {}
+        for study_label, study_object, cases in self.cases_by_study():
+            # report pdf file is made in REPORT folder
+            make_dir = os.path.join(self.__dest, study_label, "REPORT")
+            if os.path.isdir(make_dir):
 
-                    # Generation of keywords and/or readme tex files
-                    # based on metadata within the .xml file
+                # Generation of keywords and/or readme tex files
+                # based on metadata within the .xml file
+                if md is None:
                     from code_saturne.studymanager.cs_studymanager_metadata import study_metadata
                     md = study_metadata(self.__pkg, os.path.join(self.__dest, self.__filename))
-                    md.dump_keywords()
-                    md.dump_readme()
-
-                    log_name = "make_report_" + case.study + ".log"
-                    log_path = os.path.join(self.__dest, log_name)
-                    log_pdf = open(log_path, mode='w')
-                    cmd = "make pdf"
-                    pdf_retval, t = run_studymanager_command(cmd, log_pdf)
-                    log_pdf.close()
-
-                    report_pdf = "write-up.pdf"
-                    if os.path.isfile(report_pdf):
-                        self.reporting('    - write-up.pdf file was generated ' + \
-                                       'in ' + case.study + "/REPORT folder.")
-                        os.remove(log_path)
-                    else:
-                        self.reporting('    /!\ ERROR: write-up.pdf file was not ' + \
-                                       'generated. See ' + log_path)
+                md.dump_keywords(make_dir)
+                md.dump_readme(make_dir)
 
-                else:
-                    self.reporting('    - No REPORT folder: generation of ' + \
-                                   'description file is aborted.')
+                make_dirs[study_label] = make_dir
+            else:
+                make_dirs[study_label] = None
+
+        # reports of the different studies are made concurrently
+        logs = {study_label: os.path.join(self.__dest,
+                                          "make_report_" + study_label + ".log")
+                for study_label, make_dir in make_dirs.items()
+                if make_dir is not None}
+        generated = {}
+        if logs:
+            with ThreadPoolExecutor(max_workers=min(8, len(logs))) as ex:
+                for study_label, log_path in logs.items():
+                    generated[study_label] = \
+                        ex.submit(make_description_report,
+                                  make_dirs[study_label], log_path)
+
+        for study_label, make_dir in make_dirs.items():
+            if make_dir is None:
+                self.reporting('    - No REPORT folder: generation of ' + \
+                               'description file is aborted.')
+            elif generated[study_label].result():
+                self.reporting('    - write-up.pdf file was generated ' + \
+                               'in ' + study_label + "/REPORT folder.")
+            else:
+                self.reporting('    /!\ ERROR: write-up.pdf file was not ' + \
+                               'generated. See ' + logs[study_label])
+
+#-------------------------------------------------------------------------------
+
+def make_description_report(make_dir, log_path):
+    """
+    Run make pdf in a REPORT folder, logging to log_path, and return
+    True if write-up.pdf was generated (the log is then removed).
+    """
+
+    with open(log_path, mode='w') as log_pdf:
+        run_studymanager_command("make pdf", log_pdf, cwd=make_dir)
+
+    if os.path.isfile(os.path.join(make_dir, "write-up.pdf")):
+        os.remove(log_path)
+        return True
+
+    return False
+
+#-------------------------------------------------------------------------------
+
+# Studies to plot, as (plotter, plot_study arguments) tuples, shared
+# with forked plotting processes
+_plot_tasks = []
+
+def _plot_study_task(i):
+    """
+    Plot the i-th study of _plot_tasks, and return the error message
+    and the names of the generated figures.
+    """
+    plotter, *args = _plot_tasks[i]
+    study_object = args[1]
+    n_figures = len(study_object.matplotlib_figures)
+    error = plotter.plot_study(*args)
+
+    return error, study_object.matplotlib_figures[n_figures:]
+
+#-------------------------------------------------------------------------------
 
-        # move to initial location
-        os.chdir(save_dir)
+def submit_slurm_batch(batch_file, dep_job_id_list=None, cwd=None):
+    """Submit a slurm batch file, to be run after the given jobs end,
+       and return the id of the submitted job. Relative output paths
+       in the batch file are relative to cwd.
+    """
+
+    # list of dependency id should be in the :id1:id2:id3 format
+    # (empty list can occur with existing runs in study)
+    cmd = ['sbatch', '--parsable']
+    if dep_job_id_list:
+        list_id = ":".join(str(item) for item in dep_job_id_list)
+        cmd.append("--dependency=afterany:" + list_id)
+    cmd.append(batch_file)
+
+    # parsable output is "job_id" or "job_id;cluster_name"
+    output = subprocess.check_output(cmd, cwd=cwd)
+
+    return output.decode('utf-8').strip().split(';')[0]
+
+#-------------------------------------------------------------------------------
+
+def get_case_states(cases, run_timeout=3600):
+    """
+    Get the states of a list of cases, probing their run folders
+    concurrently. States are returned in the order of the cases.
+    Cases repeated in the parameters file share their run folder,
+    which is probed only once.
+    """
+
+    cases = list(cases)
+    if not cases:
+        return []
+
+    # first case of each run folder
+    probes = {}
+    for case in cases:
+        probes.setdefault(case.run_dir, case)
+
+    with ThreadPoolExecutor(max_workers=min(32, len(probes))) as ex:
+        states = dict(zip(probes,
+                          ex.map(lambda c: c.get_state(run_timeout=run_timeout),
+                                 probes.values())))
+
+    return [states[case.run_dir] for case in cases]
+
+#-------------------------------------------------------------------------------
+# Topological sort of cases
+#-------------------------------------------------------------------------------
+
+def build_case_dag(cases):
+    """
+    Build the dependency graph of a list of cases in a single pass, and
+    sort it by levels using Kahn's algorithm. The level of each case is set,
+    and the list of cases of each level is returned (cases of a given level
+    do not depend on each other).
+    Cases whose dependency is not in the list are considered of level 0.
+    """
+
+    by_title = {}
+    for case in cases:
+        by_title[case.title] = case
+
+    successors = {}
+    n_pred = {}
+    for case in cases:
+        successors[case] = []
+        n_pred[case] = 0
+    for case in cases:
+        if case.depends:
+            pred = by_title.get(case.depends)
+            if pred is not None and pred is not case:
+                successors[pred].append(case)
+                n_pred[case] += 1
+
+    batches = []
+    batch = [case for case in cases if n_pred[case] == 0]
+    level = 0
+    while batch:
+        next_batch = []
+        for case in batch:
+            case.level = level
+            for succ in successors[case]:
+                n_pred[succ] -= 1
+                if n_pred[succ] == 0:
+                    next_batch.append(succ)
+        batches.append(batch)
+        batch = next_batch
+        level += 1
+
+    # cases in a dependency cycle are never reached
+    if len(n_pred) > sum(len(b) for b in batches):
+        cycle = [case for case in cases if case.level is None]
+        for case in cycle:
+            case.level = 0
+        if batches:
+            batches[0].extend(cycle)
+        else:
+            batches.append(cycle)
+
+    return batches
 
 #-------------------------------------------------------------------------------
 # class dependency_graph
@@ -2962,10 +3610,16 @@ class dependency_graph(object):
         """ Initializes a dependency graph object to an empty dictionary
         """
         self.graph_dict = OrderedDict()
+        # cases of the graph, by title
+        self.titles = {}
         # maximum number of level in the graph
         self.max_level = 0
         # maximum number of proc used in a case of the graph
         self.max_proc = 0
+        # cases of the graph, by (level, n_procs), in graph order
+        self.buckets = {}
+        # cases whose dependency is not in the graph yet, by dependency title
+        self.__dependents = {}
 
     def add_dependency(self, dependency):
         """ Defines dependency between two cases as an edge in the graph
@@ -2986,59 +3640,49 @@ class dependency_graph(object):
         msg = None
         if case not in self.graph_dict:
             self.graph_dict[case] = None
+            self.titles[case.title] = case
 
             if case.depends:
-                for neighbor in self.graph_dict:
-                    neighbor_name = neighbor.study + '/' + neighbor.label \
-                                    + '/' + neighbor.resu + '/' + neighbor.run_id
-                    if neighbor_name == case.depends:
-                        # cases with dependency are level > 0 and connected to the dependency
-                        self.add_dependency((case, neighbor))
-                        case.level = neighbor.level + 1
-                        self.max_level = max([self.max_level, case.level])
-                        break
-                if case.level is None:
-                    case.level = 0
-                    msg = "Dependency " + case.depends + " was not found in the list " \
-                          + "of considered cases. " + case.title + " will be considered " \
-                          + "without dependency in the graph. Please check that the " \
-                          + "required results exist.\n"
+                neighbor = self.titles.get(case.depends)
+                if neighbor is not None and neighbor is not case:
+                    # cases with dependency are level > 0 and connected to the dependency
+                    self.add_dependency((case, neighbor))
+                    case.level = neighbor.level + 1
+                    self.max_level = max(self.max_level, case.level)
+                else:
+                    # the dependency may be added later (if levels are known)
+                    self.__dependents.setdefault(case.depends, []).append(case)
+                    if case.level is None:
+                        case.level = 0
+                        msg = "Dependency " + case.depends + " was not found in the list " \
+                              + "of considered cases. " + case.title + " will be considered " \
+                              + "without dependency in the graph. Please check that the " \
+                              + "required results exist.\n"
+                    self.max_level = max(self.max_level, case.level)
 
             else:
                 # cases with no dependency are level 0
                 case.level = 0
 
-            self.max_proc = max([self.max_proc, int(case.n_procs)])
+            # connect cases added earlier which depend on this one
+            for dependent in self.__dependents.pop(case.title, []):
+                self.add_dependency((dependent, case))
+
+            self.max_proc = max(self.max_proc, case.n_procs)
+            self.buckets.setdefault((case.level, case.n_procs), []).append(case)
         return msg
 
     def nodes(self):
-        """ returns the cases of the dependency graph """
-        return list(self.graph_dict.keys())
+        """ returns a view of the cases of the dependency graph """
+        return self.graph_dict.keys()
 
     def dependencies(self):
-        """ returns the dependencies between the cases of the graph """
-        dependencies = []
-        for node in self.graph_dict:
-            for neighbor in self.graph_dict[node]:
-                if (neighbor, node) not in dependencies:
-                    dependencies.append((node, neighbor))
-        return dependencies
-
-    def extract_sub_graph(self, filter_level, filter_n_procs):
-        """ extracts a sub_graph based on level and n_procs criteria"""
-        sub_graph = dependency_graph()
-        for node in self.graph_dict:
-            keep_node_l = True
-            keep_node_p = True
-            if filter_level is not None:
-                keep_node_l = int(node.level) == int(filter_level)
-            if filter_n_procs is not None:
-                keep_node_p = int(node.n_procs) == int(filter_n_procs)
-            if keep_node_l and keep_node_p:
-                msg = sub_graph.add_node(node)
-                if msg:
-                    self.reporting("Warning in sub graph: " + msg)
-        return sub_graph
+        """ returns the dependencies between the cases of the graph,
+            as (case, dependency) pairs (a case has at most one dependency)
+        """
+        return [(node, neighbor)
+                for node, neighbor in self.graph_dict.items()
+                if neighbor is not None]
 
     def __str__(self):
         res = "\nList of cases: "